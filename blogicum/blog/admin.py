@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from . import search
 from .models import Comment, Category, Location, Post
 
 
@@ -19,6 +20,13 @@ class PostAdmin(admin.ModelAdmin):
     list_display_links = ('title',)
     empty_value_display = 'Не задано'
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term or not search.is_supported(queryset.db):
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return search.matching(queryset, search_term), False
+
 
 class PostInline(admin.StackedInline):
     model = Post
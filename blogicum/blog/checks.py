@@ -0,0 +1,30 @@
+"""Проверки настроек приложения blog."""
+from django.conf import settings
+from django.core.checks import Warning, register
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """Кэш по умолчанию должен быть общим для всех процессов.
+
+    В нём хранятся поколения кэша страниц и граница публикации: их
+    меняют и веб-процессы, и run_jobs, и команды управления.
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        'Кэш по умолчанию виден только своему процессу.',
+        hint=(
+            'Сброс кэша страниц и публикация отложенных постов из других '
+            'процессов до него не дойдут. Укажите в CACHES общий бэкенд: '
+            'FileBasedCache, memcached или redis.'
+        ),
+        obj='CACHES',
+        id='blog.W001',
+    )]
@@ -0,0 +1,7 @@
+"""Контекстные процессоры приложения blog."""
+from django.conf import settings
+
+
+def fragment_cache(request):
+    """Время жизни закэшированных фрагментов шаблонов."""
+    return {'post_card_cache_timeout': settings.POST_CARD_CACHE_TIMEOUT}
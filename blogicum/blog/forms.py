@@ -1,13 +1,50 @@
 from django import forms
+from django.conf import settings
+from PIL import Image
 
+from . import uploads
 from .models import Comment, Post, User
 
 
+class BoundedImageField(forms.ImageField):
+    """Поле фото с ограничением размера файла и количества пикселей."""
+
+    default_error_messages = {
+        'file_too_large': 'Файл больше %(limit)s МБ.',
+        'too_many_pixels': (
+            'Изображение больше %(limit)s мегапикселей.'
+        ),
+    }
+
+    def to_python(self, data):
+        if data in self.empty_values:
+            return super().to_python(data)
+        limit = settings.IMAGE_UPLOAD_MAX_BYTES
+        if data.size > limit:
+            raise forms.ValidationError(
+                self.error_messages['file_too_large'],
+                code='file_too_large',
+                params={'limit': limit // 2 ** 20}
+            )
+        try:
+            pixels = uploads.pixel_count(data)
+        except (OSError, Image.DecompressionBombError):
+            pixels = 0
+        if pixels > settings.IMAGE_MAX_PIXELS:
+            raise forms.ValidationError(
+                self.error_messages['too_many_pixels'],
+                code='too_many_pixels',
+                params={'limit': settings.IMAGE_MAX_PIXELS // 10 ** 6}
+            )
+        return uploads.prepare_image(super().to_python(data))
+
+
 class PostForm(forms.ModelForm):
 
     class Meta:
         model = Post
         exclude = ('author',)
+        field_classes = {'image': BoundedImageField}
         widgets = {
             'pub_date': forms.DateTimeInput(
                 attrs={
@@ -0,0 +1,66 @@
+"""Запоминание категорий и авторов, которые разрешаются по URL."""
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+
+from .models import Category, User
+from .routers import primary_reads
+
+CATEGORY_KEY = 'blog:category:{}'
+PROFILE_KEY = 'blog:profile:{}'
+PROFILE_FIELDS = (
+    'id',
+    'username',
+    'first_name',
+    'last_name',
+    'date_joined',
+    'is_staff',
+)
+
+
+def memoize(request, key, loader):
+    """Ищет объект в запросе, затем в кэше и только потом в базе."""
+    memo = request.__dict__.setdefault('_blog_lookups', {})
+    if key not in memo:
+        obj = cache.get(key)
+        if obj is None:
+            with primary_reads():
+                obj = loader()
+            if obj is not None:
+                cache.set(key, obj, settings.LOOKUP_CACHE_TIMEOUT)
+        memo[key] = obj
+    return memo[key]
+
+
+def get_category(request, slug):
+    """Опубликованная категория по slug или 404."""
+    category = memoize(
+        request,
+        CATEGORY_KEY.format(slug),
+        lambda: Category.objects.filter(slug=slug).first()
+    )
+    if category is None or not category.is_published:
+        raise Http404('Категория не найдена.')
+    return category
+
+
+def get_profile(request, username):
+    """Пользователь по username или 404."""
+    profile = memoize(
+        request,
+        PROFILE_KEY.format(username),
+        lambda: User.objects.only(*PROFILE_FIELDS).filter(
+            username=username
+        ).first()
+    )
+    if profile is None:
+        raise Http404('Пользователь не найден.')
+    return profile
+
+
+def forget_category(*slugs):
+    cache.delete_many([CATEGORY_KEY.format(slug) for slug in slugs])
+
+
+def forget_profile(*usernames):
+    cache.delete_many([PROFILE_KEY.format(name) for name in usernames])
@@ -0,0 +1,366 @@
+"""Нагрузочный замер основных страниц блога.
+
+Запросы выполняются внутри процесса через обработчик Django или
+отправляются на запущенный сервер (--url). Для каждого сценария
+считаются запросы в секунду, задержки p50/p95/p99 и число SQL-запросов,
+результат пишется в JSON. Набор данных выбирается переменной окружения
+BLOGICUM_DB_PATH, а --scale при необходимости заполняет его командой
+generate_data.
+"""
+import http.client
+import json
+import math
+import platform
+import sqlite3
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from blog import metrics, page_cache
+from blog.models import Category, Comment, Post, User
+from blog.pagination import encode_cursor
+from blog.query_utils import get_posts
+
+SCALES = {
+    '1k': {
+        'users': 100, 'categories': 10, 'locations': 20,
+        'posts': 1000, 'comments': 10000,
+    },
+    '100k': {
+        'users': 5000, 'categories': 50, 'locations': 200,
+        'posts': 100000, 'comments': 500000,
+    },
+    '1m': {
+        'users': 50000, 'categories': 200, 'locations': 1000,
+        'posts': 1000000, 'comments': 2000000,
+    },
+}
+# Адрес вне INTERNAL_IPS, чтобы при DEBUG не включалась панель отладки.
+REMOTE_ADDR = '192.0.2.1'
+SCENARIOS = (
+    'index', 'last_page', 'deep_page', 'category', 'profile', 'post_detail',
+    'comment_post',
+)
+
+
+def percentile(quantiles, value):
+    return round(quantiles[value - 1] * 1000, 3)
+
+
+def summarize(latencies, elapsed, statuses):
+    """Сводка по задержкам одного сценария в миллисекундах."""
+    quantiles = statistics.quantiles(latencies, n=100, method='inclusive')
+    return {
+        'requests': len(latencies),
+        'statuses': dict(sorted(
+            (str(status), n) for status, n in statuses.items()
+        )),
+        'rps': round(len(latencies) / elapsed, 1),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+        'p50_ms': percentile(quantiles, 50),
+        'p95_ms': percentile(quantiles, 95),
+        'p99_ms': percentile(quantiles, 99),
+        'max_ms': round(max(latencies) * 1000, 3),
+    }
+
+
+def _host():
+    hosts = [host for host in settings.ALLOWED_HOSTS if '*' not in host]
+    return hosts[0].lstrip('.') if hosts else 'localhost'
+
+
+class InProcessTransport:
+    """Запросы через обработчик Django в текущем процессе."""
+
+    def __init__(self, user=None):
+        self.user = user
+        self.local = threading.local()
+
+    def client(self):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = Client(
+                raise_request_exception=False,
+                HTTP_HOST=_host(),
+                REMOTE_ADDR=REMOTE_ADDR
+            )
+            if self.user is not None:
+                client.force_login(self.user)
+            self.local.client = client
+        return client
+
+    def send(self, method, path, data=None):
+        if method == 'POST':
+            return self.client().post(path, data).status_code
+        return self.client().get(path).status_code
+
+
+class HttpTransport:
+    """Запросы к запущенному серверу, по соединению на поток."""
+
+    def __init__(self, url, user=None):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise CommandError('Адрес --url должен начинаться с http(s)://')
+        self.parts = parts
+        self.prefix = parts.path.rstrip('/')
+        self.local = threading.local()
+        self.csrf_token = get_random_string(32)
+        cookies = {settings.CSRF_COOKIE_NAME: self.csrf_token}
+        if user is not None:
+            client = Client()
+            client.force_login(user)
+            cookies[settings.SESSION_COOKIE_NAME] = (
+                client.cookies[settings.SESSION_COOKIE_NAME].value
+            )
+        self.cookie = '; '.join(f'{k}={v}' for k, v in cookies.items())
+
+    def connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection_class = (
+                http.client.HTTPSConnection if self.parts.scheme == 'https'
+                else http.client.HTTPConnection
+            )
+            connection = connection_class(self.parts.netloc, timeout=30)
+            self.local.connection = connection
+        return connection
+
+    def send(self, method, path, data=None):
+        headers = {'Cookie': self.cookie}
+        body = None
+        if data is not None:
+            body = urlencode({**data, 'csrfmiddlewaretoken': self.csrf_token})
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        try:
+            connection = self.connection()
+            connection.request(method, self.prefix + path, body, headers)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self.local.connection = None
+            return 'error'
+        if response.getheader('Connection', '').lower() == 'close':
+            connection.close()
+            self.local.connection = None
+        return response.status
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет пропускную способность и задержки страниц блога и '
+        'пишет результат в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            help='Адрес запущенного сервера; без него запросы выполняются '
+                 'внутри процесса.'
+        )
+        parser.add_argument(
+            '--scale',
+            choices=SCALES,
+            help='Размер набора данных; недостающие данные создаются '
+                 'командой generate_data.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            choices=SCENARIOS,
+            dest='scenarios',
+            help='Сценарий замера; можно указать несколько раз.'
+        )
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=20)
+        parser.add_argument('--concurrency', type=int, default=1)
+        parser.add_argument(
+            '--authenticated',
+            action='store_true',
+            help='Читать страницы под пользователем, в обход кэша страниц.'
+        )
+        parser.add_argument('--output', help='Файл для результата в JSON.')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 2:
+            raise CommandError('--requests должен быть не меньше 2.')
+        if settings.DEBUG:
+            self.stderr.write(self.style.WARNING(
+                'DEBUG включён: результаты не соответствуют рабочему режиму.'
+            ))
+        if options['scale']:
+            self.prepare(options['scale'], options['seed'])
+        targets = self.targets()
+        user = targets.pop('user')
+        reader = user if options['authenticated'] else None
+        if options['url']:
+            readers = HttpTransport(options['url'], reader)
+            writers = HttpTransport(options['url'], user)
+        else:
+            readers = InProcessTransport(reader)
+            writers = InProcessTransport(user)
+        scenarios = {}
+        for name in options['scenarios'] or SCENARIOS:
+            method, path, data = targets[name]
+            transport = writers if method == 'POST' else readers
+            result = {'method': method, 'path': path}
+            result.update(self.measure(transport, method, path, data, options))
+            result.update(self.count_queries(
+                user if method == 'POST' else reader, method, path, data
+            ))
+            scenarios[name] = result
+            self.stderr.write(
+                f"{name:>13}: {result['rps']:>8} rps, "
+                f"p50 {result['p50_ms']} мс, p99 {result['p99_ms']} мс, "
+                f"SQL {result['queries']}"
+            )
+        report = {
+            'scale': options['scale'],
+            'mode': options['url'] or 'in-process',
+            'authenticated': options['authenticated'],
+            'concurrency': options['concurrency'],
+            'started_at': timezone.now().isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'sqlite': sqlite3.sqlite_version,
+                'debug': settings.DEBUG,
+            },
+            'dataset': {
+                'users': User.objects.count(),
+                'posts': Post.objects.count(),
+                'comments': Comment.objects.count(),
+            },
+            'scenarios': scenarios,
+        }
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def prepare(self, scale, seed):
+        """Доводит базу до размера scale, если данных меньше."""
+        call_command('migrate', verbosity=0)
+        posts = SCALES[scale]['posts']
+        missing = posts - Post.objects.count()
+        if missing > 0:
+            self.stderr.write(f'Генерация набора данных {scale}…')
+            call_command(
+                'generate_data',
+                **{
+                    **SCALES[scale],
+                    'posts': missing,
+                    'comments': SCALES[scale]['comments'] * missing // posts,
+                },
+                seed=seed,
+                prefix=scale,
+                stdout=self.stderr,
+            )
+
+    def targets(self):
+        """Адреса сценариев по текущим данным базы."""
+        published = get_posts(filter_flag=True)
+        feed = published.order_by('-pub_date', '-id')
+        count = feed.count()
+        if not count:
+            raise CommandError(
+                'Нет опубликованных постов: заполните базу командой '
+                'generate_data или укажите --scale.'
+            )
+        middle = feed.values_list('pub_date', 'id')[count // 2]
+        last_page = min(
+            settings.MAX_PAGE_NUMBER,
+            math.ceil(count / settings.NUMBER_OF_POSTS)
+        )
+        deep_page = urlencode({'cursor': encode_cursor(middle)})
+        category = Category.objects.filter(is_published=True).annotate(
+            n=Count('posts')
+        ).order_by('-n').first()
+        author = User.objects.annotate(n=Count('posts')).order_by(
+            '-n'
+        ).first()
+        post = published.order_by('-comment_count', '-id').first()
+        index = reverse('blog:index')
+        return {
+            'user': author,
+            'index': ('GET', index, None),
+            'last_page': (
+                'GET', f'{index}?page={last_page}', None
+            ),
+            'deep_page': ('GET', f'{index}?{deep_page}', None),
+            'category': ('GET', reverse(
+                'blog:category_posts', args=[category.slug]
+            ), None),
+            'profile': (
+                'GET', reverse('blog:profile', args=[author.username]), None
+            ),
+            'post_detail': (
+                'GET', reverse('blog:post_detail', args=[post.pk]), None
+            ),
+            'comment_post': (
+                'POST', reverse('blog:add_comment', args=[post.pk]),
+                {'text': 'Комментарий нагрузочного замера'}
+            ),
+        }
+
+    def measure(self, transport, method, path, data, options):
+        concurrency = options['concurrency']
+        for _ in range(options['warmup']):
+            transport.send(method, path, data)
+        shares = [
+            options['requests'] // concurrency
+            + (index < options['requests'] % concurrency)
+            for index in range(concurrency)
+        ]
+
+        def worker(count):
+            latencies = []
+            statuses = Counter()
+            for _ in range(count):
+                start = time.perf_counter()
+                statuses[transport.send(method, path, data)] += 1
+                latencies.append(time.perf_counter() - start)
+            return latencies, statuses
+
+        start = time.perf_counter()
+        if concurrency == 1:
+            results = [worker(options['requests'])]
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                results = list(executor.map(worker, shares))
+        elapsed = time.perf_counter() - start
+        latencies = [value for result, _ in results for value in result]
+        statuses = sum((counts for _, counts in results), Counter())
+        return summarize(latencies, elapsed, statuses)
+
+    def count_queries(self, user, method, path, data):
+        """SQL-запросы сценария: с промахом кэша страниц и повторно.
+
+        Считаются всегда в текущем процессе, в том числе при --url.
+        """
+        transport = InProcessTransport(user)
+        transport.client()
+        counts = {}
+        page_cache.invalidate(page_cache.SITE)
+        for key in ('queries', 'cached_queries'):
+            request_metrics = metrics.RequestMetrics()
+            with request_metrics.track():
+                transport.send(method, path, data)
+            counts[key] = request_metrics.queries
+        return counts
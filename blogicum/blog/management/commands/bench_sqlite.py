@@ -0,0 +1,152 @@
+"""Нагрузочный тест SQLite: читатели ленты и авторы комментариев."""
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.sqlite3.base import FORMAT_QMARK_REGEX
+from django.utils import timezone
+
+from blog.models import Post, User
+from blog.query_utils import get_posts
+from blogicum.db.sqlite3.base import apply_pragmas
+
+MODES = {
+    'default': ({}, 'DEFERRED'),
+    'tuned': (settings.SQLITE_PRAGMAS, settings.SQLITE_TRANSACTION_MODE),
+}
+
+INSERT_COMMENT = (
+    'INSERT INTO blog_comment (text, post_id, author_id, created_at) '
+    'VALUES (?, ?, ?, ?)'
+)
+UPDATE_COUNT = (
+    'UPDATE blog_post SET comment_count = comment_count + 1 WHERE id = ?'
+)
+
+
+class MixedWorkload:
+    """Потоки-читатели ленты и потоки, добавляющие комментарии."""
+
+    def __init__(self, path, pragmas, begin, feed_query, ids):
+        self.path = path
+        self.pragmas = pragmas
+        self.begin = begin
+        self.feed_query = feed_query
+        self.post_id, self.author_id = ids
+        self.stats = {'reads': 0, 'writes': 0, 'errors': 0}
+        self.lock = threading.Lock()
+        self.deadline = 0
+
+    def connect(self):
+        db = sqlite3.connect(
+            self.path, isolation_level=None, check_same_thread=False
+        )
+        apply_pragmas(db, self.pragmas)
+        return db
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def count_error(self, error):
+        if 'locked' not in str(error) and 'busy' not in str(error):
+            raise error
+        self.count('errors')
+
+    def read(self):
+        db = self.connect()
+        while time.monotonic() < self.deadline:
+            try:
+                db.execute(*self.feed_query).fetchall()
+                self.count('reads')
+            except sqlite3.OperationalError as error:
+                self.count_error(error)
+        db.close()
+
+    def write(self):
+        db = self.connect()
+        while time.monotonic() < self.deadline:
+            try:
+                db.execute(f'BEGIN {self.begin}')
+                db.execute(
+                    INSERT_COMMENT,
+                    ('Тест', self.post_id, self.author_id, timezone.now())
+                )
+                db.execute(UPDATE_COUNT, (self.post_id,))
+                db.execute('COMMIT')
+                self.count('writes')
+            except sqlite3.OperationalError as error:
+                if db.in_transaction:
+                    db.execute('ROLLBACK')
+                self.count_error(error)
+        db.close()
+
+    def run(self, readers, writers, duration):
+        self.deadline = time.monotonic() + duration
+        threads = [
+            threading.Thread(target=self.read) for _ in range(readers)
+        ] + [
+            threading.Thread(target=self.write) for _ in range(writers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite с настройками по '
+        'умолчанию и с SQLITE_PRAGMAS при смешанной нагрузке.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=5.0,
+            help='Длительность прогона каждого режима, с.'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда работает только с SQLite.')
+        post_id = Post.objects.values_list('pk', flat=True).first()
+        author_id = User.objects.values_list('pk', flat=True).first()
+        if post_id is None or author_id is None:
+            raise CommandError('Нужен хотя бы один пост и пользователь.')
+        sql, params = get_posts(filter_flag=True, defer_flag=True)[
+            :settings.NUMBER_OF_POSTS
+        ].query.sql_with_params()
+        sql = FORMAT_QMARK_REGEX.sub('?', sql).replace('%%', '%')
+        connection.ensure_connection()
+        for mode, (pragmas, begin) in MODES.items():
+            with tempfile.TemporaryDirectory() as directory:
+                path = Path(directory) / 'bench.sqlite3'
+                target = sqlite3.connect(path)
+                connection.connection.backup(target)
+                target.execute('PRAGMA journal_mode = DELETE')
+                target.close()
+                workload = MixedWorkload(
+                    path, pragmas, begin, (sql, params), (post_id, author_id)
+                )
+                stats = workload.run(
+                    options['readers'], options['writers'],
+                    options['duration']
+                )
+            self.report(mode, stats, options['duration'])
+
+    def report(self, mode, stats, duration):
+        self.stdout.write(
+            f'{mode:>8}: чтений/с {stats["reads"] / duration:9.1f}, '
+            f'записей/с {stats["writes"] / duration:8.1f}, '
+            f'ошибок блокировки {stats["errors"]}'
+        )
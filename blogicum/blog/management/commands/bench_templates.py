@@ -0,0 +1,251 @@
+"""Замер рендеринга шаблонов блога без обращений к базе.
+
+Шаблоны рендерятся с несохранёнными объектами моделей. Для каждого
+шаблона считается время рендеринга с прогретым и с пустым кэшем
+фрагментов, а профилировщик blog.template_profiler показывает время
+вложенных шаблонов и самых долгих узлов.
+"""
+import json
+import statistics
+import time
+from contextlib import ExitStack
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import resolve
+from django.utils import timezone
+
+from blog import template_profiler
+from blog.tasks import make_request
+from blog.forms import CommentForm
+from blog.models import Category, Comment, Location, Post, User
+from blog.pagination import CursorPage
+
+TEMPLATES = (
+    'blog/index.html',
+    'blog/category.html',
+    'blog/profile.html',
+    'blog/detail.html',
+    'includes/post_card.html',
+    'includes/post_image.html',
+    'includes/category_link.html',
+    'includes/comment_list.html',
+    'includes/paginator.html',
+    'includes/header.html',
+)
+TEXT = (
+    'Утром вышли к реке, к обеду дошли до перевала, а вечером смотрели, '
+    'как над лесом садится солнце. '
+)
+
+
+def build_context(posts=settings.NUMBER_OF_POSTS,
+                  comments=settings.NUMBER_OF_COMMENTS):
+    """Контекст для всех шаблонов из несохранённых объектов."""
+    now = timezone.now()
+    author = User(
+        pk=1, username='author', first_name='Анна', last_name='Иванова',
+        date_joined=now
+    )
+    category = Category(
+        pk=1, title='Путешествия', slug='travel',
+        description='Заметки из поездок', is_published=True
+    )
+    location = Location(pk=1, name='Алтай', is_published=True)
+    renditions = {
+        'source': 'post_image/bench.jpg', 'width': 1280, 'height': 960,
+        'webp': [[320, 'post_image/renditions/bench-320.0123456789ab.webp'],
+                 [640, 'post_image/renditions/bench-640.0123456789ab.webp']],
+        'jpeg': [[320, 'post_image/renditions/bench-320.0123456789ab.jpeg'],
+                 [640, 'post_image/renditions/bench-640.0123456789ab.jpeg']],
+    }
+    post_list = []
+    for index in range(1, posts + 1):
+        text = TEXT * 20
+        post = Post(
+            pk=index, title=f'Пост {index}', text=text,
+            excerpt=Post.make_excerpt(text),
+            pub_date=now - timedelta(hours=index), author=author,
+            category=category, location=location, is_published=True,
+            comment_count=comments, updated_at=now, created_at=now
+        )
+        if index % 2:
+            post.image = renditions['source']
+            post.image_renditions = renditions
+        post_list.append(post)
+    commenter = User(pk=2, username='reader', date_joined=now)
+    comment_list = [
+        Comment(
+            pk=index, post=post_list[0], author=commenter,
+            text='Отличная заметка!\nСпасибо.', created_at=now
+        )
+        for index in range(1, comments + 1)
+    ]
+    paginator = Paginator(post_list * settings.MAX_PAGE_NUMBER, posts)
+    page = paginator.page(3)
+    page.elided_page_range = list(paginator.get_elided_page_range(3))
+    return {
+        'page_obj': page,
+        'post_obj': page.object_list,
+        'paginator': paginator,
+        'is_paginated': True,
+        'category': category,
+        'profile': author,
+        'post': post_list[0],
+        'form': CommentForm(),
+        'comments': CursorPage(comment_list, None, 'bench', None),
+    }
+
+
+def fragment_cache():
+    """Кэш, в который пишет тег {% cache %}."""
+    try:
+        return caches['template_fragments']
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+def fragment_keys(context):
+    """Ключи фрагментов карточек постов из контекста.
+
+    Замер без кэша удаляет только их, не трогая остальной общий кэш.
+    """
+    posts = {post.pk: post for post in [*context['post_obj'], context['post']]}
+    return [
+        make_template_fragment_key(
+            'post_card', [post.pk, post.updated_at.timestamp()]
+        )
+        for post in posts.values()
+    ]
+
+
+def timings(samples):
+    ordered = sorted(samples)
+    return {
+        'mean_ms': round(statistics.fmean(samples) * 1000, 4),
+        'p50_ms': round(statistics.median(ordered) * 1000, 4),
+        'p95_ms': round(ordered[int(len(ordered) * 0.95)] * 1000, 4),
+    }
+
+
+def forbid_queries(execute, sql, params, many, context):
+    raise CommandError(f'Шаблон обратился к базе данных: {sql}')
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет рендеринг шаблонов блога на объектах в памяти и '
+        'разбивает его время по вложенным шаблонам и узлам.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--template',
+            action='append',
+            choices=TEMPLATES,
+            dest='templates',
+            help='Шаблон для замера; можно указать несколько раз.'
+        )
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--profile-iterations',
+            type=int,
+            default=20,
+            help='Рендерингов под профилировщиком на шаблон.'
+        )
+        parser.add_argument(
+            '--nodes',
+            type=int,
+            default=15,
+            help='Сколько самых долгих узлов включить в отчёт.'
+        )
+        parser.add_argument(
+            '--posts', type=int, default=settings.NUMBER_OF_POSTS
+        )
+        parser.add_argument(
+            '--comments', type=int, default=settings.NUMBER_OF_COMMENTS
+        )
+        parser.add_argument(
+            '--authenticated',
+            action='store_true',
+            help='Рендерить для автора постов, а не для анонима.'
+        )
+        parser.add_argument('--output', help='Файл для результата в JSON.')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations должен быть положительным.')
+        if settings.DEBUG:
+            self.stderr.write(self.style.WARNING(
+                'DEBUG включён: шаблоны не кэшируются загрузчиком, '
+                'результаты не соответствуют рабочему режиму.'
+            ))
+        context = build_context(options['posts'], options['comments'])
+        request = make_request(
+            '/', context['profile'] if options['authenticated'] else None
+        )
+        request.resolver_match = resolve('/')
+        names = options['templates'] or TEMPLATES
+        results = {}
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(forbid_queries))
+            # Профилировщик ставится после замеров, чтобы не влиять на них.
+            for name in names:
+                results[name] = self.measure(name, context, request, options)
+            stack.callback(template_profiler.uninstall)
+            for name in names:
+                results[name]['profile'] = self.profile(
+                    name, context, request, options
+                )
+        for name, result in results.items():
+            self.stderr.write(
+                f"{name:>28}: {result['warm']['mean_ms']} мс, "
+                f"без кэша {result['cold']['mean_ms']} мс"
+            )
+        output = json.dumps({
+            'debug': settings.DEBUG,
+            'authenticated': options['authenticated'],
+            'posts': options['posts'],
+            'comments': options['comments'],
+            'iterations': options['iterations'],
+            'templates': results,
+        }, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def measure(self, name, context, request, options):
+        template = get_template(name)
+        for _ in range(options['warmup']):
+            template.render(context, request)
+        result = {'bytes': len(template.render(context, request).encode())}
+        cache = fragment_cache()
+        keys = fragment_keys(context)
+        for mode in ('warm', 'cold'):
+            samples = []
+            for _ in range(options['iterations']):
+                if mode == 'cold':
+                    cache.delete_many(keys)
+                start = time.perf_counter()
+                template.render(context, request)
+                samples.append(time.perf_counter() - start)
+            result[mode] = timings(samples)
+        return result
+
+    def profile(self, name, context, request, options):
+        template = get_template(name)
+        runs = options['profile_iterations']
+        with template_profiler.profile() as current:
+            for _ in range(runs):
+                template.render(context, request)
+        return current.report(options['nodes'], runs)
@@ -0,0 +1,69 @@
+"""Команда построения уменьшенных копий фото существующих постов."""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+from PIL import Image
+
+from blog import renditions
+from blog.models import Post
+
+
+def render_safely(source_name):
+    """Выполняется в дочернем процессе; ошибки возвращаются строкой."""
+    try:
+        return renditions.render(source_name), None
+    except (OSError, Image.DecompressionBombError) as error:
+        return None, str(error)
+
+
+class Command(BaseCommand):
+    help = (
+        'Строит копии фото в post_image/ для постов, у которых их ещё нет, '
+        'в пуле процессов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Количество процессов.'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Перестроить копии у всех постов с фото.'
+        )
+
+    def get_pending(self, force):
+        posts = Post.objects.exclude(image='').order_by('pk').values_list(
+            'pk', 'image', 'image_renditions'
+        )
+        return [
+            (pk, image) for pk, image, stored in posts.iterator()
+            if force or stored.get('source') != image
+        ]
+
+    def handle(self, *args, **options):
+        pending = self.get_pending(options['force'])
+        # Дочерние процессы открывают свои соединения с базой.
+        connections.close_all()
+        built = failed = 0
+        with ProcessPoolExecutor(
+                max_workers=options['workers'],
+                initializer=django.setup) as executor:
+            results = executor.map(
+                render_safely, [image for _, image in pending], chunksize=4
+            )
+            for (pk, image), (metadata, error) in zip(pending, results):
+                if error is not None:
+                    failed += 1
+                    self.stderr.write(f'{image}: {error}')
+                    continue
+                built += renditions.store(pk, image, metadata)
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано постов: {built}, ошибок: {failed}'
+        ))
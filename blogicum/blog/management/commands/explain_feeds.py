@@ -0,0 +1,70 @@
+"""Команда вывода планов запросов для лент публикаций."""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from blog.models import Category, User
+from blog.query_utils import get_posts
+
+SCAN_MARKERS = (
+    'USE TEMP B-TREE FOR ORDER BY',
+    'SCAN blog_post',
+    'Seq Scan on blog_post',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Печатает EXPLAIN для запросов ленты, категории и профиля '
+        'и предупреждает о сканировании таблицы с сортировкой.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--category', help='Slug категории.')
+        parser.add_argument('--username', help='Имя автора для профиля.')
+
+    def get_category(self, slug):
+        categories = Category.objects.filter(is_published=True)
+        if slug:
+            categories = categories.filter(slug=slug)
+        return categories.first()
+
+    def get_author(self, username):
+        if username:
+            return User.objects.filter(username=username).first()
+        return User.objects.filter(posts__isnull=False).first()
+
+    def get_querysets(self, options):
+        querysets = [('Лента (PostsList)', get_posts(filter_flag=True))]
+        category = self.get_category(options['category'])
+        if category:
+            querysets.append((
+                f'Категория {category.slug} (CategoryList)',
+                get_posts(manager=category.posts, filter_flag=True)
+            ))
+        author = self.get_author(options['username'])
+        if author:
+            querysets.append((
+                f'Профиль {author.username} (ProfileList)',
+                get_posts(manager=author.posts, filter_flag=True)
+            ))
+            querysets.append((
+                f'Свой профиль {author.username} (ProfileList, автор)',
+                get_posts(manager=author.posts)
+            ))
+        return querysets
+
+    def handle(self, *args, **options):
+        page_size = settings.NUMBER_OF_POSTS
+        for title, queryset in self.get_querysets(options):
+            plan = queryset[:page_size].explain()
+            self.stdout.write(self.style.MIGRATE_HEADING(title))
+            self.stdout.write(plan)
+            if any(marker in plan for marker in SCAN_MARKERS):
+                self.stdout.write(self.style.WARNING(
+                    'План использует сканирование и сортировку '
+                    f'({connection.vendor}).'
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS('Используется индекс.'))
+            self.stdout.write('')
@@ -0,0 +1,347 @@
+"""Команда генерации большого набора тестовых данных."""
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from io import BytesIO
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+from PIL import Image
+
+from blog import page_cache, renditions, scheduling, search
+from blog.models import Category, Comment, Location, Post, User
+
+WORDS = (
+    'блог путешествие город утро вечер дорога река море горы лес поле '
+    'кофе книга музыка фото друзья работа отпуск погода снег дождь солнце '
+    'история заметка идея проект день неделя месяц год дом улица парк '
+    'поезд самолёт машина велосипед прогулка ужин завтрак рецепт вкус '
+    'впечатление совет вопрос ответ мысль мечта план цель шаг путь'
+).split()
+CHUNK_SIZE = 20000
+BATCH_SIZE = 2000
+PASSWORD = 'password'
+
+
+def heavy_tailed_counts(total, size, rng, exponent=1.0):
+    """Распределяет total по size ячейкам по закону Ципфа."""
+    weights = [1 / rank ** exponent for rank in range(1, size + 1)]
+    rng.shuffle(weights)
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    heaviest = sorted(range(size), key=weights.__getitem__, reverse=True)
+    for index in heaviest[:total - sum(counts)]:
+        counts[index] += 1
+    return counts
+
+
+def cumulative_zipf(size, exponent=1.0):
+    total = 0.0
+    cumulative = []
+    for rank in range(1, size + 1):
+        total += 1 / rank ** exponent
+        cumulative.append(total)
+    return cumulative
+
+
+def words(rng, low, high):
+    return ' '.join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+
+def generate_posts(seed, chunk, count, spec):
+    """Строки постов одного чанка; выполняется в дочернем процессе."""
+    rng = random.Random(f'{seed}:posts:{chunk}')
+    authors = rng.choices(
+        range(spec['users']), cum_weights=spec['author_weights'], k=count
+    )
+    rows = []
+    for author in authors:
+        if rng.random() < spec['future']:
+            offset = timedelta(seconds=rng.uniform(3600, 30 * 86400))
+        else:
+            offset = -timedelta(seconds=rng.uniform(0, 3 * 365 * 86400))
+        rows.append((
+            words(rng, 2, 6).capitalize(),
+            '\n\n'.join(
+                words(rng, 15, 80).capitalize() + '.'
+                for _ in range(rng.randint(1, 5))
+            ),
+            spec['now'] + offset,
+            author,
+            rng.choices(
+                range(spec['categories']),
+                cum_weights=spec['category_weights']
+            )[0],
+            rng.randrange(spec['locations'])
+            if rng.random() < 0.7 else None,
+            rng.random() >= spec['unpublished'],
+            rng.choice(spec['images'])
+            if spec['images'] and rng.random() < spec['with_image'] else '',
+        ))
+    return rows
+
+
+def generate_comments(seed, chunk, posts, spec):
+    """Строки комментариев для пар (индекс поста, количество)."""
+    rng = random.Random(f'{seed}:comments:{chunk}')
+    rows = []
+    for post, count in posts:
+        authors = rng.choices(
+            range(spec['users']), cum_weights=spec['author_weights'], k=count
+        )
+        rows.extend((post, author, words(rng, 3, 40)) for author in authors)
+    return rows
+
+
+def comment_chunks(counts):
+    chunk = []
+    size = 0
+    for post, count in enumerate(counts):
+        if count:
+            chunk.append((post, count))
+            size += count
+        if size >= CHUNK_SIZE:
+            yield chunk
+            chunk, size = [], 0
+    if chunk:
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует пользователей, категории, местоположения, посты и '
+        'комментарии с реалистичными распределениями. При одинаковом --seed '
+        'результат одинаковый; повторный запуск использует уже созданных '
+        'пользователей и категории и добавляет новые посты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--locations', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument(
+            '--prefix',
+            default='gen',
+            help='Префикс имён пользователей и slug категорий.'
+        )
+        parser.add_argument('--future-fraction', type=float, default=0.05)
+        parser.add_argument(
+            '--unpublished-fraction', type=float, default=0.05
+        )
+        parser.add_argument('--image-fraction', type=float, default=0.2)
+        parser.add_argument(
+            '--comment-skew',
+            type=float,
+            default=1.0,
+            help='Показатель закона Ципфа для числа комментариев к постам.'
+        )
+        parser.add_argument(
+            '--images',
+            type=int,
+            default=8,
+            help='Количество разных фото, общих для постов.'
+        )
+
+    def handle(self, *args, **options):
+        seed = options['seed']
+        prefix = f"{options['prefix']}{seed}"
+        rng = random.Random(f'{seed}:base')
+        user_ids = self.create_users(prefix, options['users'])
+        category_ids = self.create_categories(
+            prefix, options['categories'], rng
+        )
+        location_ids = self.create_locations(options['locations'], rng)
+        images = self.create_images(prefix, options, rng)
+        spec = {
+            'users': len(user_ids),
+            'author_weights': cumulative_zipf(len(user_ids)),
+            'categories': len(category_ids),
+            'category_weights': cumulative_zipf(len(category_ids)),
+            'locations': len(location_ids),
+            'future': options['future_fraction'],
+            'unpublished': options['unpublished_fraction'],
+            'with_image': options['image_fraction'],
+            'images': sorted(images),
+            'now': timezone.now().replace(microsecond=0),
+        }
+        counts = heavy_tailed_counts(
+            options['comments'], options['posts'],
+            random.Random(f'{seed}:comment-counts'), options['comment_skew']
+        )
+        # Дочерние процессы не должны унаследовать открытые соединения.
+        connections.close_all()
+        with ProcessPoolExecutor(
+                max_workers=options['workers'],
+                initializer=django.setup) as executor:
+            post_ids = self.create_posts(
+                executor, seed, spec, counts,
+                (user_ids, category_ids, location_ids, images)
+            )
+            self.create_comments(
+                executor, seed, spec, counts, post_ids, user_ids
+            )
+        self.stdout.write('Обновление поискового индекса…')
+        search.rebuild()
+        scheduling.refresh()
+        page_cache.invalidate(page_cache.SITE)
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {len(user_ids)}, '
+            f'постов {len(post_ids)}, комментариев {sum(counts)}'
+        ))
+
+    def insert(self, model, objects):
+        """Вставляет объекты в одной транзакции и возвращает их id."""
+        last_id = model.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+        except IntegrityError as error:
+            raise CommandError(
+                f'Не удалось создать {model._meta.verbose_name_plural}: '
+                f'{error}. Укажите другой --prefix.'
+            ) from error
+        return list(
+            model.objects.filter(pk__gt=last_id).order_by('pk').values_list(
+                'pk', flat=True
+            )
+        )
+
+    def insert_missing(self, model, field, prefix, objects):
+        """Вставляет объекты, которых ещё нет, и возвращает id всех.
+
+        Уже созданные объекты ищутся по уникальному полю field, значения
+        которого начинаются с prefix, поэтому повторный запуск с тем же
+        --seed не падает на них.
+        """
+        keys = [getattr(obj, field) for obj in objects]
+        ids = dict(
+            model.objects.filter(**{f'{field}__startswith': prefix})
+            .values_list(field, 'pk')
+        )
+        missing = [obj for obj in objects if getattr(obj, field) not in ids]
+        for start in range(0, len(missing), CHUNK_SIZE):
+            chunk = missing[start:start + CHUNK_SIZE]
+            ids.update(zip(
+                (getattr(obj, field) for obj in chunk),
+                self.insert(model, chunk)
+            ))
+        return [ids[key] for key in keys]
+
+    def create_users(self, prefix, count):
+        password = make_password(PASSWORD)
+        return self.insert_missing(User, 'username', prefix, [
+            User(
+                username=f'{prefix}_user{index}',
+                email=f'{prefix}_user{index}@example.com',
+                password=password
+            )
+            for index in range(count)
+        ])
+
+    def create_categories(self, prefix, count, rng):
+        return self.insert_missing(Category, 'slug', prefix, [
+            Category(
+                title=words(rng, 1, 3).capitalize(),
+                description=words(rng, 10, 30).capitalize(),
+                slug=f'{prefix}-category-{index}',
+                is_published=rng.random() >= 0.1
+            )
+            for index in range(count)
+        ])
+
+    def create_locations(self, count, rng):
+        return self.insert(Location, [
+            Location(name=words(rng, 1, 2).capitalize())
+            for _ in range(count)
+        ])
+
+    def create_images(self, prefix, options, rng):
+        """Сохраняет общие для постов фото и строит их копии."""
+        images = {}
+        for index in range(options['images']):
+            buffer = BytesIO()
+            Image.effect_noise((1280, 960), rng.uniform(20, 80)).convert(
+                'RGB'
+            ).save(buffer, 'JPEG', quality=85)
+            name = default_storage.save(
+                f'post_image/{prefix}_{index}.jpg',
+                ContentFile(buffer.getvalue())
+            )
+            images[name] = renditions.render(name)
+        return images
+
+    def create_posts(self, executor, seed, spec, counts, related):
+        user_ids, category_ids, location_ids, images = related
+        total = len(counts)
+        starts = range(0, total, CHUNK_SIZE)
+        chunks = executor.map(
+            generate_posts,
+            [seed] * len(starts),
+            range(len(starts)),
+            [min(CHUNK_SIZE, total - start) for start in starts],
+            [spec] * len(starts)
+        )
+        post_ids = []
+        for start, rows in zip(starts, chunks):
+            post_ids += self.insert(Post, [
+                Post(
+                    title=title,
+                    text=text,
+                    excerpt=Post.make_excerpt(text),
+                    pub_date=pub_date,
+                    author_id=user_ids[author],
+                    category_id=category_ids[category],
+                    location_id=(
+                        None if location is None else location_ids[location]
+                    ),
+                    is_published=is_published,
+                    image=image,
+                    image_renditions=images.get(image, {}),
+                    comment_count=counts[start + offset]
+                )
+                for offset, (
+                    title, text, pub_date, author, category, location,
+                    is_published, image
+                ) in enumerate(rows)
+            ])
+            self.stdout.write(f'Постов: {len(post_ids)}')
+        return post_ids
+
+    def create_comments(self, executor, seed, spec, counts, post_ids,
+                        user_ids):
+        chunks = list(comment_chunks(counts))
+        results = executor.map(
+            generate_comments,
+            [seed] * len(chunks),
+            range(len(chunks)),
+            chunks,
+            [spec] * len(chunks)
+        )
+        created = 0
+        for rows in results:
+            with transaction.atomic():
+                Comment.objects.bulk_create(
+                    [
+                        Comment(
+                            post_id=post_ids[post],
+                            author_id=user_ids[author],
+                            text=text
+                        )
+                        for post, author, text in rows
+                    ],
+                    batch_size=BATCH_SIZE
+                )
+            created += len(rows)
+            self.stdout.write(f'Комментариев: {created}')
@@ -0,0 +1,50 @@
+"""Команда, сдвигающая границу публикации к выходу отложенных постов."""
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog import scheduling, tasks
+from jobs.queue import enqueue
+
+MAX_SLEEP = 60
+
+
+class Command(BaseCommand):
+    help = (
+        'Сдвигает границу публикации, когда наступает дата отложенного '
+        'поста. С --loop работает постоянно и просыпается к выходу постов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а ждать следующей публикации.'
+        )
+
+    def sweep(self, previous_pending=None):
+        cutoff, next_pending = scheduling.get_state()
+        if previous_pending is not None and previous_pending <= cutoff:
+            # Лента изменилась: прогреваем её первую страницу заранее.
+            enqueue(tasks.warm_pages, '/', priority=-10, key='warm:/')
+        pending = (
+            f'{next_pending:%Y-%m-%d %H:%M:%S}' if next_pending else 'нет'
+        )
+        self.stdout.write(
+            f'Граница публикации: {cutoff:%Y-%m-%d %H:%M:%S}, '
+            f'следующая отложенная публикация: {pending}'
+        )
+        return next_pending
+
+    def handle(self, *args, **options):
+        next_pending = self.sweep()
+        while options['loop']:
+            delay = MAX_SLEEP
+            if next_pending is not None:
+                delay = min(
+                    delay,
+                    max((next_pending - timezone.now()).total_seconds(), 0)
+                )
+            time.sleep(delay)
+            next_pending = self.sweep(next_pending)
@@ -0,0 +1,52 @@
+"""Команда пересчёта счётчиков комментариев у постов."""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from blog.models import Comment, Post
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает поле comment_count у всех постов пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество постов, обрабатываемых за одну транзакцию.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        updated = 0
+        while True:
+            posts = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .only('pk', 'comment_count')[:batch_size]
+            )
+            if not posts:
+                break
+            last_pk = posts[-1].pk
+            with transaction.atomic():
+                counts = dict(
+                    Comment.objects.filter(post__in=posts)
+                    .values_list('post_id')
+                    .annotate(total=Count('pk'))
+                    .order_by()
+                )
+                changed = []
+                for post in posts:
+                    total = counts.get(post.pk, 0)
+                    if post.comment_count != total:
+                        post.comment_count = total
+                        changed.append(post)
+                Post.objects.bulk_update(changed, ('comment_count',))
+            updated += len(changed)
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено постов: {updated}')
+        )
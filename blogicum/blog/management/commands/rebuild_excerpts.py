@@ -0,0 +1,45 @@
+"""Команда заполнения анонсов постов."""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает поле excerpt у всех постов пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество постов, обрабатываемых за одну транзакцию.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        updated = 0
+        while True:
+            posts = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .only('pk', 'text', 'excerpt')[:batch_size]
+            )
+            if not posts:
+                break
+            last_pk = posts[-1].pk
+            changed = []
+            for post in posts:
+                excerpt = Post.make_excerpt(post.text)
+                if post.excerpt != excerpt:
+                    post.excerpt = excerpt
+                    changed.append(post)
+            with transaction.atomic():
+                Post.objects.bulk_update(changed, ('excerpt',))
+            updated += len(changed)
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено постов: {updated}')
+        )
@@ -0,0 +1,26 @@
+"""Команда перестроения поискового индекса постов."""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from blog import search
+
+
+class Command(BaseCommand):
+    help = 'Заново строит полнотекстовый индекс FTS5 по всем постам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='База данных, индекс которой нужно перестроить.'
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if not search.is_supported(using):
+            raise CommandError('Поисковый индекс есть только в SQLite.')
+        with transaction.atomic(using=using):
+            count = search.rebuild(using)
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано постов: {count}')
+        )
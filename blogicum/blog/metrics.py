@@ -0,0 +1,150 @@
+"""Счётчики SQL-запросов, рендеринга и размера ответов по представлениям.
+
+Запросы считаются обёрткой execute_wrapper на соединениях с базой,
+время рендеринга — шаблонным бэкендом DjangoTemplates из этого модуля.
+Итоги копятся в памяти процесса и периодически пишутся в лог.
+"""
+import logging
+import threading
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends import django as django_backend
+from django.template.exceptions import TemplateDoesNotExist
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('blog_request_metrics', default=None)
+_totals = {}
+_lock = threading.Lock()
+_last_log = time.monotonic()
+
+
+class RequestMetrics:
+    """Показатели одного запроса."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        self.rendering = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_time += time.perf_counter() - start
+
+    def track(self):
+        """Контекст, в котором учитываются запросы ко всем базам."""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        token = _current.set(self)
+        stack.callback(_current.reset, token)
+        return stack
+
+
+def get_budget(view_name):
+    return settings.QUERY_BUDGETS.get(view_name)
+
+
+def record(view_name, metrics, size):
+    """Добавляет показатели запроса к итогам представления."""
+    global _last_log
+    with _lock:
+        totals = _totals.setdefault(view_name, {
+            'requests': 0,
+            'queries': 0,
+            'max_queries': 0,
+            'over_budget': 0,
+            'sql_time': 0.0,
+            'render_time': 0.0,
+            'bytes': 0,
+        })
+        totals['requests'] += 1
+        totals['queries'] += metrics.queries
+        totals['max_queries'] = max(totals['max_queries'], metrics.queries)
+        totals['sql_time'] += metrics.sql_time
+        totals['render_time'] += metrics.render_time
+        totals['bytes'] += size
+        budget = get_budget(view_name)
+        if budget is not None and metrics.queries > budget:
+            totals['over_budget'] += 1
+        now = time.monotonic()
+        log_due = now - _last_log >= settings.QUERY_METRICS_LOG_INTERVAL
+        if log_due:
+            _last_log = now
+    if budget is not None and metrics.queries > budget:
+        logger.warning(
+            '%s: %d SQL-запросов при бюджете %d',
+            view_name, metrics.queries, budget
+        )
+    if log_due:
+        log_totals()
+
+
+def snapshot():
+    """Итоги по представлениям со средними значениями."""
+    with _lock:
+        totals = {name: dict(values) for name, values in _totals.items()}
+    for name, values in totals.items():
+        requests = values['requests']
+        values['budget'] = get_budget(name)
+        values['avg_queries'] = round(values['queries'] / requests, 2)
+        values['avg_sql_ms'] = round(values['sql_time'] * 1000 / requests, 3)
+        values['avg_render_ms'] = round(
+            values['render_time'] * 1000 / requests, 3
+        )
+        values['avg_bytes'] = values['bytes'] // requests
+    return totals
+
+
+def reset():
+    with _lock:
+        _totals.clear()
+
+
+def log_totals():
+    for name, values in sorted(snapshot().items()):
+        logger.info(
+            '%s: запросов %d, SQL %.2f/запрос (%.3f мс), '
+            'рендеринг %.3f мс, ответ %d Б, сверх бюджета %d',
+            name, values['requests'], values['avg_queries'],
+            values['avg_sql_ms'], values['avg_render_ms'],
+            values['avg_bytes'], values['over_budget']
+        )
+
+
+class Template(django_backend.Template):
+    """Шаблон, учитывающий время рендеринга в показателях запроса."""
+
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None or metrics.rendering:
+            return super().render(context, request)
+        metrics.rendering += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.render_time += time.perf_counter() - start
+            metrics.rendering -= 1
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """Бэкенд DjangoTemplates с учётом времени рендеринга."""
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
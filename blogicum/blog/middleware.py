@@ -0,0 +1,98 @@
+"""Промежуточные слои приложения blog."""
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+
+from . import metrics, template_profiler
+from .routers import PIN_COOKIE
+
+
+class ReplicaPinMiddleware:
+    """После записи закрепляет пользователя за основной базой.
+
+    Реплики отстают от основной базы, поэтому ещё REPLICA_PIN_SECONDS
+    после POST пользователь читает с неё и видит свои изменения.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (settings.DATABASE_REPLICAS
+                and request.method == 'POST'
+                and request.user.is_authenticated
+                and response.status_code < 500):
+            response.set_cookie(
+                PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
+
+
+class QueryMetricsMiddleware:
+    """Считает SQL-запросы, время рендеринга и размер ответа.
+
+    Итоги по имени представления доступны в blog.metrics, запросы сверх
+    бюджета из QUERY_BUDGETS попадают в лог предупреждением.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_metrics = metrics.RequestMetrics()
+        with request_metrics.track():
+            response = self.get_response(request)
+        match = request.resolver_match
+        if response.streaming:
+            size = int(response.get('Content-Length', 0))
+        else:
+            size = len(response.content)
+        metrics.record(
+            match.view_name if match else 'unresolved',
+            request_metrics,
+            size
+        )
+        return response
+
+
+class TemplateProfilerMiddleware:
+    """Разбивает время рендеринга страницы по шаблонам и узлам.
+
+    Включается настройкой TEMPLATE_PROFILER. Персоналу вместо страницы,
+    открытой с параметром PROFILE_PARAM, отдаётся отчёт в JSON.
+    """
+
+    PROFILE_PARAM = 'profile_templates'
+
+    def __init__(self, get_response):
+        if not settings.TEMPLATE_PROFILER:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (self.PROFILE_PARAM not in request.GET
+                or not request.user.is_staff):
+            return self.get_response(request)
+        start = time.perf_counter()
+        try:
+            with template_profiler.profile() as profile:
+                response = self.get_response(request)
+        finally:
+            # Вне профилирования движок шаблонов работает без обёрток.
+            template_profiler.uninstall_if_idle()
+        report = {
+            'path': request.path,
+            'status': response.status_code,
+            'response_ms': round((time.perf_counter() - start) * 1000, 3),
+        }
+        report.update(profile.report())
+        return JsonResponse(report, json_dumps_params={'indent': 2})
@@ -1,14 +1,122 @@
 """Mixins.py для миксинов."""
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.core.paginator import InvalidPage
+from django.http import Http404, HttpResponseRedirect
 from django.shortcuts import redirect
 
+from . import page_cache
+from .pagination import CursorPaginator, ShallowPaginator
+from .routers import is_pinned, primary_reads, replica_reads
+from .write_queue import run_write, save_files
+
 
 class OnlyAuthorMixin(UserPassesTestMixin):
     """Миксин для проверки авторства."""
 
     def test_func(self):
         object = self.get_object()
-        return object.author == self.request.user
+        return object.author_id == self.request.user.pk
 
     def handle_no_permission(self):
         return redirect('blog:post_detail', post_id=self.kwargs['post_id'])
+
+
+class AnonymousPageCacheMixin:
+    """Миксин кэширования страниц для анонимных пользователей."""
+
+    def get_cache_groups(self):
+        return (page_cache.SITE,)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        key = page_cache.page_key(request, self.get_cache_groups())
+        response = page_cache.get_page(key)
+        if response is not None:
+            return response
+        # Страница попадёт в кэш, поэтому читается с основной базы.
+        with primary_reads():
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        page_cache.set_page(key, response)
+        return response
+
+
+class ReplicaReadMixin:
+    """Миксин, читающий данные страницы с реплики.
+
+    Ответ рендерится внутри блока, чтобы ленивые запросы шаблона тоже
+    ушли на реплику.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or is_pinned(request):
+            return super().dispatch(request, *args, **kwargs)
+        with replica_reads():
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        return response
+
+
+class CachedObjectMixin:
+    """Миксин, запоминающий объект на время обработки запроса."""
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_cached_object'):
+            self._cached_object = super().get_object()
+        return self._cached_object
+
+
+class CursorPaginationMixin:
+    """Миксин пагинации: номера для первых страниц, курсор для остальных."""
+
+    paginator_class = ShallowPaginator
+    cursor_kwarg = 'cursor'
+    cursor_ordering = ('-pub_date', '-id')
+
+    def get_count_key(self):
+        """Ключ кэша количества объектов; None — считать каждый раз."""
+        return None
+
+    def get_paginator(self, *args, **kwargs):
+        return super().get_paginator(
+            *args, count_key=self.get_count_key(), **kwargs
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        cursor = self.request.GET.get(self.cursor_kwarg)
+        if cursor is None:
+            paginator, page, object_list, is_paginated = (
+                super().paginate_queryset(queryset, page_size)
+            )
+            if (page.number == paginator.num_pages
+                    and paginator.has_deeper_pages()):
+                page.next_cursor = CursorPaginator(
+                    queryset, page_size, self.cursor_ordering
+                ).cursor_for(page.object_list[len(page) - 1])
+            return paginator, page, object_list, is_paginated
+        paginator = CursorPaginator(queryset, page_size, self.cursor_ordering)
+        try:
+            page = paginator.page(cursor)
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class QueuedWriteMixin:
+    """Миксин, выполняющий запись объекта через очередь записи."""
+
+    def form_valid(self, form):
+        save_files(form.instance)
+        self.object = run_write(form.save)
+        return HttpResponseRedirect(self.get_success_url())
+
+    def delete(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        success_url = self.get_success_url()
+        run_write(self.object.delete)
+        return HttpResponseRedirect(success_url)
@@ -1,9 +1,12 @@
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
 from django.db import models
 from django.urls import reverse
+from django.utils.text import Truncator
 
 MAX_LENGTH_TITLE = 256  # Максимальная длина полей
 LIMIT_TEXT = 15  # Максимальная длина текста для __str__
+EXCERPT_WORDS = 10  # Количество слов в анонсе поста
 
 User = get_user_model()
 
@@ -96,12 +99,54 @@ class Post(PublishModel):
         verbose_name='Категория'
     )
     image = models.ImageField('Фото', upload_to='post_image', blank=True)
+    image_renditions = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Уменьшенные копии фото'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
+    excerpt = models.TextField(
+        default='',
+        blank=True,
+        editable=False,
+        verbose_name='Анонс'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_feed_idx'
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_category_feed_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_author_feed_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_idx'
+            ),
+        )
 
     def __str__(self):
         return self.title[:LIMIT_TEXT]
@@ -109,6 +154,40 @@ class Post(PublishModel):
     def get_absolute_url(self):
         return reverse('blog:profile', kwargs={'username': self.author})
 
+    def _srcset(self, image_format):
+        return ', '.join(
+            f'{default_storage.url(name)} {width}w'
+            for width, name in self.image_renditions.get(image_format, ())
+        )
+
+    @property
+    def webp_srcset(self):
+        return self._srcset('webp')
+
+    @property
+    def jpeg_srcset(self):
+        return self._srcset('jpeg')
+
+    @property
+    def image_fallback_url(self):
+        """Самая крупная копия в JPEG, если копии уже построены."""
+        jpeg = self.image_renditions.get('jpeg')
+        if jpeg:
+            return default_storage.url(jpeg[-1][1])
+        return self.image.url
+
+    @staticmethod
+    def make_excerpt(text):
+        return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+
+    def save(self, *args, **kwargs):
+        if 'text' not in self.get_deferred_fields():
+            self.excerpt = self.make_excerpt(self.text)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'text' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     text = models.TextField(verbose_name='Текст')
@@ -0,0 +1,175 @@
+"""Кэш страниц для анонимных пользователей."""
+import hashlib
+import threading
+import time
+import uuid
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .scheduling import get_cutoff
+
+SITE = 'site'
+FEED = 'feed'
+GENERATION_KEY = 'blog:generation:{}'
+PAGE_KEY = 'blog:page:{}'
+COUNT_KEY = 'blog:count:{}'
+STATS_KEYS = {
+    True: 'blog:page_cache:hits',
+    False: 'blog:page_cache:misses',
+}
+
+_pending = {True: 0, False: 0}
+_pending_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def category_group(category_id):
+    return f'category:{category_id}'
+
+
+def profile_group(user_id):
+    return f'profile:{user_id}'
+
+
+def post_group(post_id):
+    return f'post:{post_id}'
+
+
+def post_groups(post_id, category_id, author_id):
+    """Группы страниц, на которых выводится пост."""
+    return (
+        FEED,
+        category_group(category_id),
+        profile_group(author_id),
+        post_group(post_id),
+    )
+
+
+def new_generation():
+    return uuid.uuid4().hex
+
+
+def get_generations(groups):
+    """Текущие поколения групп; отсутствующие заводятся заново."""
+    keys = [GENERATION_KEY.format(group) for group in groups]
+    generations = cache.get_many(keys)
+    missing = {key: new_generation() for key in keys if key not in generations}
+    if missing:
+        cache.set_many(missing, None)
+        generations.update(missing)
+    return [generations[key] for key in keys]
+
+
+def invalidate(*groups):
+    """Сдвигает поколения групп, делая их страницы недоступными.
+
+    Поколение заменяется новым уникальным значением, а не увеличивается:
+    incr общего кэша не атомарен, и два одновременных сдвига могли бы
+    дать одно и то же поколение.
+    """
+    cache.set_many(
+        {GENERATION_KEY.format(group): new_generation() for group in groups},
+        None
+    )
+
+
+def invalidate_on_commit(*groups, using=None):
+    """Сдвигает поколения после фиксации текущей транзакции.
+
+    До фиксации параллельный запрос ещё видит старые данные и мог бы
+    сохранить их под уже новым поколением.
+    """
+    transaction.on_commit(partial(invalidate, *groups), using=using)
+
+
+def page_key(request, groups):
+    generations = ':'.join(map(str, get_generations(groups)))
+    cutoff = get_cutoff().timestamp()
+    digest = hashlib.md5(
+        f'{request.get_full_path()}|{generations}|{cutoff}'.encode()
+    ).hexdigest()
+    return PAGE_KEY.format(digest)
+
+
+def count_key(group, *parts):
+    """Ключ кэша количества постов группы с учётом её поколения.
+
+    Поколение SITE тоже входит в ключ: снятие категории или места с
+    публикации меняет количество постов во всех лентах.
+    """
+    generations = get_generations((SITE, group))
+    cutoff = get_cutoff().timestamp()
+    return COUNT_KEY.format(':'.join(
+        map(str, (group, *parts, *generations, cutoff))
+    ))
+
+
+def _take_pending():
+    with _pending_lock:
+        pending = dict(_pending)
+        _pending.update({True: 0, False: 0})
+    return pending
+
+
+def flush_stats():
+    """Переносит накопленные процессом счётчики в общий кэш."""
+    for hit, count in _take_pending().items():
+        if not count:
+            continue
+        key = STATS_KEYS[hit]
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key, count)
+        except ValueError:
+            pass
+
+
+def record(hit):
+    """Считает попадание или промах в памяти процесса.
+
+    В общий кэш счётчики переносятся не чаще раза в
+    PAGE_CACHE_STATS_INTERVAL секунд, поэтому попадание обходится без
+    записи в кэш.
+    """
+    global _last_flush
+    with _pending_lock:
+        _pending[hit] += 1
+        now = time.monotonic()
+        if now - _last_flush < settings.PAGE_CACHE_STATS_INTERVAL:
+            return
+        _last_flush = now
+    flush_stats()
+
+
+def get_stats():
+    """Количество попаданий и промахов кэша страниц.
+
+    К общим счётчикам добавляются ещё не перенесённые счётчики текущего
+    процесса.
+    """
+    values = cache.get_many(STATS_KEYS.values())
+    with _pending_lock:
+        pending = dict(_pending)
+    return {
+        'hits': values.get(STATS_KEYS[True], 0) + pending[True],
+        'misses': values.get(STATS_KEYS[False], 0) + pending[False],
+    }
+
+
+def reset_stats():
+    _take_pending()
+    cache.delete_many(STATS_KEYS.values())
+
+
+def get_page(key):
+    response = cache.get(key)
+    record(response is not None)
+    return response
+
+
+def set_page(key, response):
+    if response.status_code == 200 and not response.cookies:
+        cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
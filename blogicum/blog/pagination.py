@@ -0,0 +1,197 @@
+"""Пагинация лент публикаций."""
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from datetime import date, datetime
+from math import ceil
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .routers import primary_reads
+
+
+def _dump_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(values, reverse=False):
+    """Кодирует значения ключа сортировки в непрозрачный токен."""
+    payload = json.dumps(
+        {'v': [_dump_value(value) for value in values], 'r': reverse},
+        separators=(',', ':')
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Возвращает значения ключа сортировки и направление из токена."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return list(data['v']), bool(data['r'])
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        raise InvalidPage('Некорректный курсор.')
+
+
+class CursorPage(Sequence):
+    """Страница, полученная по курсору."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<Cursor page>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Пагинатор по ключу сортировки без OFFSET и COUNT."""
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+
+    def cursor_for(self, obj, reverse=False):
+        """Токен, указывающий на позицию сразу после/перед объектом."""
+        return encode_cursor(
+            [getattr(obj, field.lstrip('-')) for field in self.ordering],
+            reverse
+        )
+
+    def _seek(self, values, reverse):
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            step = Q(**{f'{name}__{"lt" if descending else "gt"}': (
+                values[index]
+            )})
+            for prev_field, prev_value in zip(self.ordering[:index], values):
+                step &= Q(**{prev_field.lstrip('-'): prev_value})
+            condition |= step
+        return condition
+
+    def _field(self, name):
+        annotation = self.object_list.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return self.object_list.model._meta.get_field(name)
+
+    def _to_python(self, values):
+        """Приводит значения из токена к типам полей сортировки."""
+        if len(values) != len(self.ordering):
+            raise InvalidPage('Некорректный курсор.')
+        converted = []
+        for field, value in zip(self.ordering, values):
+            try:
+                value = self._field(field.lstrip('-')).to_python(value)
+            except (ValidationError, TypeError, ValueError):
+                raise InvalidPage('Некорректный курсор.')
+            if value is None:
+                raise InvalidPage('Некорректный курсор.')
+            converted.append(value)
+        return converted
+
+    def page(self, cursor):
+        values, reverse = decode_cursor(cursor) if cursor else (None, False)
+        if values is not None:
+            values = self._to_python(values)
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(
+                field[1:] if field.startswith('-') else f'-{field}'
+                for field in ordering
+            )
+        queryset = self.object_list.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, reverse))
+        object_list = list(queryset[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+        if reverse:
+            object_list.reverse()
+        has_next = has_more if not reverse else values is not None
+        has_previous = values is not None if not reverse else has_more
+        next_cursor = previous_cursor = None
+        if object_list and has_next:
+            next_cursor = self.cursor_for(object_list[-1])
+        if object_list and has_previous:
+            previous_cursor = self.cursor_for(object_list[0], reverse=True)
+        return CursorPage(object_list, self, next_cursor, previous_cursor)
+
+
+class ShallowPaginator(Paginator):
+    """Постраничный пагинатор, ограниченный первыми страницами ленты.
+
+    Количество объектов считается не дальше последней доступной страницы
+    и хранится в кэше под ключом count_key, если он передан.
+    """
+
+    def __init__(self, *args, max_page=None, count_key=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_page = max_page or settings.MAX_PAGE_NUMBER
+        self.count_key = count_key
+
+    @cached_property
+    def count(self):
+        limit = self.max_page * self.per_page + self.orphans + 1
+        key = self.count_key and f'{self.count_key}:{limit}'
+        if key is not None:
+            count = cache.get(key)
+            if count is not None:
+                return count
+        if key is None:
+            return self.object_list[:limit].count()
+        with primary_reads():
+            count = self.object_list[:limit].count()
+        cache.set(key, count, settings.PAGE_CACHE_TIMEOUT)
+        return count
+
+    @cached_property
+    def total_pages(self):
+        if self.count == 0 and not self.allow_empty_first_page:
+            return 0
+        hits = max(1, self.count - self.orphans)
+        return ceil(hits / self.per_page)
+
+    @cached_property
+    def num_pages(self):
+        return min(self.total_pages, self.max_page)
+
+    def has_deeper_pages(self):
+        return self.total_pages > self.num_pages
+
+    def _get_page(self, *args, **kwargs):
+        page = super()._get_page(*args, **kwargs)
+        page.elided_page_range = list(
+            self.get_elided_page_range(page.number)
+        )
+        return page
@@ -1,22 +1,35 @@
 """Агрегирующие функции для запросов."""
-from django.db.models import Count
-from django.utils import timezone
+from django.db.models import Q
 
 from .models import Post
+from .scheduling import get_cutoff
 
 
-def get_posts(manager=Post.objects, filter_flag=False, annotate_flag=False):
+def published_posts_filter():
+    """Условие видимости поста для всех пользователей."""
+    return Q(
+        pub_date__lte=get_cutoff(),
+        is_published=True,
+        category__is_published=True
+    )
+
+
+def visible_posts_filter(user):
+    """Условие видимости поста для пользователя: автор видит все свои."""
+    visible = published_posts_filter()
+    if user.is_authenticated:
+        visible |= Q(author=user)
+    return visible
+
+
+def get_posts(manager=Post.objects, filter_flag=False, defer_flag=False):
     """Функция определяющая базовый запрос для всех пользователей."""
     queryset = manager.select_related(
         'category',
         'author',
         'location')
     if filter_flag:
-        queryset = queryset.filter(
-            pub_date__lte=timezone.now(),
-            is_published=True,
-            category__is_published=True)
-    if annotate_flag:
-        queryset = queryset.annotate(
-            comment_count=Count('comments')).order_by('-pub_date',)
+        queryset = queryset.filter(published_posts_filter())
+    if defer_flag:
+        queryset = queryset.defer('text')
     return queryset
@@ -0,0 +1,122 @@
+"""Уменьшенные копии фотографий постов.
+
+Для каждой ширины из IMAGE_RENDITION_WIDTHS, не превышающей ширину
+оригинала, сохраняются копии в WebP и JPEG. В имя копии входит хэш её
+содержимого, поэтому адрес меняется вместе с файлом.
+
+Метаданные хранятся в Post.image_renditions: имя исходного файла, его
+ширина и высота и списки пар [ширина, имя файла] для каждого формата.
+"""
+import hashlib
+import logging
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image
+
+from . import page_cache
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+RENDITIONS_DIR = 'post_image/renditions'
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def rendition_names(renditions):
+    """Имена файлов всех копий из метаданных поста."""
+    return {
+        name
+        for image_format in FORMATS
+        for _, name in renditions.get(image_format, ())
+    }
+
+
+def _save(image, stem, width, image_format, storage):
+    pil_format, options = FORMATS[image_format]
+    buffer = BytesIO()
+    image.save(buffer, pil_format, **options)
+    content = buffer.getvalue()
+    digest = hashlib.md5(content).hexdigest()[:12]
+    name = f'{RENDITIONS_DIR}/{stem}-{width}.{digest}.{image_format}'
+    if not storage.exists(name):
+        name = storage.save(name, ContentFile(content))
+    return name
+
+
+def render(source_name, storage=default_storage):
+    """Строит копии файла и возвращает метаданные копий."""
+    stem = PurePosixPath(source_name).stem
+    with storage.open(source_name) as file, Image.open(file) as image:
+        width, height = image.size
+        widths = sorted(
+            {min(value, width) for value in settings.IMAGE_RENDITION_WIDTHS},
+            reverse=True
+        )
+        # JPEG декодируется сразу в уменьшенном масштабе.
+        image.draft('RGB', (widths[0], max(1, height * widths[0] // width)))
+        image = image.convert('RGB')
+    renditions = {'source': source_name, 'width': width, 'height': height}
+    for image_format in FORMATS:
+        renditions[image_format] = []
+    for target in widths:
+        size = (target, max(1, round(height * target / width)))
+        if image.size != size:
+            image = image.resize(size, Image.Resampling.LANCZOS)
+        for image_format in FORMATS:
+            renditions[image_format].insert(
+                0, [target, _save(image, stem, target, image_format, storage)]
+            )
+    return renditions
+
+
+def store(post_id, source_name, renditions, storage=default_storage):
+    """Сохраняет метаданные копий, если фото поста за это время не сменилось.
+
+    Копии, на которые больше не ссылается пост, удаляются.
+    """
+    post = Post.objects.filter(pk=post_id).only(
+        'image', 'image_renditions', 'category_id', 'author_id'
+    ).first()
+    if post is None or post.image.name != source_name:
+        return False
+    Post.objects.filter(pk=post_id, image=source_name).update(
+        image_renditions=renditions,
+        updated_at=timezone.now()
+    )
+    for name in rendition_names(post.image_renditions) - rendition_names(
+            renditions):
+        storage.delete(name)
+    page_cache.invalidate_on_commit(
+        *page_cache.post_groups(post_id, post.category_id, post.author_id)
+    )
+    return True
+
+
+def update_post(post_id):
+    """Приводит копии фото поста в соответствие с его текущим фото."""
+    post = Post.objects.filter(pk=post_id).only('image').first()
+    if post is None:
+        return
+    source_name = post.image.name or ''
+    renditions = {'source': source_name}
+    if source_name:
+        try:
+            renditions = render(source_name)
+        except (OSError, Image.DecompressionBombError):
+            logger.warning(
+                'Не удалось построить копии %s', source_name, exc_info=True
+            )
+    store(post_id, source_name, renditions)
+
+
+def delete_renditions(renditions, storage=default_storage):
+    for name in rendition_names(renditions):
+        storage.delete(name)
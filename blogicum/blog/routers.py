@@ -0,0 +1,63 @@
+"""Маршрутизация чтения на реплики базы данных."""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PIN_COOKIE = 'blog_primary'
+
+_replica = ContextVar('read_replica', default=None)
+_primary_only = ContextVar('primary_only', default=False)
+
+
+@contextmanager
+def replica_reads():
+    """Направляет чтения внутри блока на одну случайную реплику.
+
+    Реплика выбирается один раз на блок: запросы одной страницы читают
+    один и тот же снимок базы.
+    """
+    replicas = settings.DATABASE_REPLICAS
+    token = _replica.set(random.choice(replicas) if replicas else None)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Направляет чтения внутри блока на основную базу, даже в replica_reads.
+
+    Так читается всё, что попадает в общий кэш: отстающая реплика
+    оставила бы в нём устаревшие данные и после своей синхронизации.
+    """
+    token = _primary_only.set(True)
+    try:
+        yield
+    finally:
+        _primary_only.reset(token)
+
+
+def is_pinned(request):
+    """Пользователь недавно писал и должен читать с основной базы."""
+    return PIN_COOKIE in request.COOKIES
+
+
+class ReplicaRouter:
+    """Отдаёт чтения репликам только внутри replica_reads()."""
+
+    def db_for_read(self, model, **hints):
+        if _primary_only.get():
+            return 'default'
+        return _replica.get() or 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
@@ -0,0 +1,46 @@
+"""Граница публикации, которая сдвигается только при выходе постов."""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Post
+
+STATE_KEY = 'blog:publication_state'
+
+
+def refresh(now=None):
+    """Сдвигает границу к текущему времени и ищет следующий пост."""
+    now = now or timezone.now()
+    next_pending = Post.objects.filter(pub_date__gt=now).order_by(
+        'pub_date'
+    ).values_list('pub_date', flat=True).first()
+    state = (now, next_pending)
+    cache.set(STATE_KEY, state, settings.PUBLICATION_STATE_TIMEOUT)
+    return state
+
+
+def get_state():
+    """Текущая граница и дата ближайшей отложенной публикации."""
+    now = timezone.now()
+    state = cache.get(STATE_KEY)
+    if (state is None or state[0] > now
+            or state[1] is not None and state[1] <= now):
+        state = refresh(now)
+    return state
+
+
+def get_cutoff():
+    """Граница для фильтра pub_date__lte.
+
+    Между границей и ближайшей отложенной публикацией постов нет, поэтому
+    до её наступления фильтр по границе равносилен фильтру по текущему
+    времени, а запросы и ключи кэша не меняются.
+    """
+    return get_state()[0]
+
+
+def schedule(pub_date):
+    """Учитывает новую дату публикации, попавшую за границу."""
+    state = cache.get(STATE_KEY)
+    if state is not None and pub_date > state[0]:
+        cache.delete(STATE_KEY)
@@ -0,0 +1,112 @@
+"""Полнотекстовый поиск по постам.
+
+В SQLite заголовки и тексты постов хранятся в виртуальной таблице FTS5,
+rowid которой совпадает с id поста. На других СУБД поиск сводится к
+фильтру icontains без ранжирования.
+"""
+import re
+
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'blog_post_fts'
+TOKEN_RE = re.compile(r'\w+')
+# bm25 возвращает тем меньшее значение, чем релевантнее пост.
+ORDERING = ('rank', 'id')
+# Веса столбцов title и text для bm25.
+WEIGHTS = (10.0, 1.0)
+
+
+def is_supported(using='default'):
+    return connections[using].vendor == 'sqlite'
+
+
+def match_expression(query):
+    """Запрос FTS5: все слова строки как префиксы в кавычках.
+
+    Кавычки не дают словам пользователя превратиться в операторы FTS5.
+    """
+    return ' '.join(f'"{token}"*' for token in TOKEN_RE.findall(query))
+
+
+def index_post(post_id, using='default'):
+    """Перезаписывает пост в поисковом индексе."""
+    if not is_supported(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+            'SELECT id, title, text FROM blog_post WHERE id = %s',
+            [post_id]
+        )
+
+
+def remove_post(post_id, using='default'):
+    """Удаляет пост из поискового индекса."""
+    if not is_supported(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id])
+
+
+def rebuild(using='default'):
+    """Заново строит индекс по всем постам и возвращает их количество."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+            'SELECT id, title, text FROM blog_post'
+        )
+        count = cursor.rowcount
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')"
+        )
+    return count
+
+
+def _fallback_filter(query):
+    condition = Q()
+    for token in TOKEN_RE.findall(query):
+        condition &= Q(title__icontains=token) | Q(text__icontains=token)
+    return condition
+
+
+def matching(queryset, query):
+    """Посты из queryset, подходящие под запрос, без ранжирования."""
+    expression = match_expression(query)
+    if not expression:
+        return queryset.none()
+    if not is_supported(queryset.db):
+        return queryset.filter(_fallback_filter(query))
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        (expression,)
+    ))
+
+
+def search_posts(queryset, query):
+    """Посты из queryset, подходящие под запрос, с релевантностью rank.
+
+    rank есть и у пустого результата: по нему сортирует пагинатор.
+    """
+    expression = match_expression(query)
+    no_rank = Value(0.0, output_field=FloatField())
+    if not expression:
+        return queryset.none().annotate(rank=no_rank)
+    if not is_supported(queryset.db):
+        return queryset.filter(_fallback_filter(query)).annotate(
+            rank=no_rank
+        )
+    table = queryset.model._meta.db_table
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[
+            f'{FTS_TABLE}.rowid = {table}.id',
+            f'{FTS_TABLE} MATCH %s',
+        ],
+        params=[expression],
+    ).annotate(rank=RawSQL(
+        f'bm25({FTS_TABLE}, %s, %s)', WEIGHTS, output_field=FloatField()
+    ))
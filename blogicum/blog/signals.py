@@ -0,0 +1,286 @@
+"""Сигналы приложения blog."""
+import threading
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from jobs.queue import enqueue
+
+from . import lookups, page_cache, renditions, scheduling, search, tasks
+from .models import Category, Comment, Location, Post, User
+
+# Поля категории и места, которые выводятся в карточке поста.
+CARD_FIELDS = {
+    Category: ('title', 'slug', 'is_published'),
+    Location: ('name', 'is_published'),
+}
+
+
+_local = threading.local()
+
+
+def _deleting(kind):
+    """Id постов или авторов, которые удаляются в текущем потоке.
+
+    Django каскадно удаляет комментарии по одному сигналу на строку;
+    пока удаляется их пост или автор, счётчик пересчитывается один раз
+    в pre_delete, а построчные обработчики ничего не делают.
+    """
+    if not hasattr(_local, 'deleting'):
+        _local.deleting = {'posts': set(), 'authors': set()}
+    return _local.deleting[kind]
+
+
+def _parent_deleted(comment):
+    return (
+        comment.post_id in _deleting('posts')
+        or comment.author_id in _deleting('authors')
+    )
+
+
+@receiver(pre_delete, sender=Post)
+def mark_deleted_post(sender, instance, **kwargs):
+    """Счётчик удаляемого поста обновлять не нужно."""
+    _deleting('posts').add(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def unmark_deleted_post(sender, instance, **kwargs):
+    _deleting('posts').discard(instance.pk)
+
+
+@receiver(pre_delete, sender=User)
+def subtract_author_comments(sender, instance, using, **kwargs):
+    """Вычитает комментарии удаляемого пользователя одним запросом."""
+    _deleting('authors').add(instance.pk)
+    counts = Comment.objects.using(using).filter(
+        post=OuterRef('pk'), author=instance
+    ).order_by().values('post').annotate(total=Count('pk')).values('total')
+    Post.objects.using(using).filter(comments__author=instance).exclude(
+        author=instance
+    ).update(comment_count=F('comment_count') - Subquery(counts))
+
+
+@receiver(post_delete, sender=User)
+def unmark_deleted_author(sender, instance, **kwargs):
+    _deleting('authors').discard(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, **kwargs):
+    """Увеличивает счётчик комментариев поста при добавлении комментария."""
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    """Уменьшает счётчик комментариев поста при удалении комментария."""
+    if _parent_deleted(instance):
+        return
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1
+    )
+
+
+def _stored_value(sender, instance, field, update_fields):
+    if instance.pk is None or (update_fields and field not in update_fields):
+        return None
+    return sender.objects.filter(pk=instance.pk).values_list(
+        field, flat=True
+    ).first()
+
+
+def _stored_values(sender, instance, fields, update_fields):
+    if update_fields:
+        fields = [field for field in fields if field in update_fields]
+    if instance.pk is None or not fields:
+        return None
+    return sender.objects.filter(pk=instance.pk).values(*fields).first()
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Location)
+def remember_card_fields(sender, instance, update_fields, **kwargs):
+    """Запоминает поля, выводимые в карточках постов.
+
+    Прежний slug категории нужен и для сброса её из кэша.
+    """
+    instance._stored_card_fields = _stored_values(
+        sender, instance, CARD_FIELDS[sender], update_fields
+    )
+
+
+def _card_fields_changed(instance):
+    stored = getattr(instance, '_stored_card_fields', None) or {}
+    return any(
+        getattr(instance, field) != value for field, value in stored.items()
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def forget_category(sender, instance, using, **kwargs):
+    """Сбрасывает закэшированную категорию после фиксации."""
+    stored = getattr(instance, '_stored_card_fields', None) or {}
+    transaction.on_commit(partial(
+        lookups.forget_category,
+        instance.slug, *filter(None, [stored.get('slug')])
+    ), using=using)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_site_pages(sender, instance, using, **kwargs):
+    """Категории и места выводятся в карточках на всех страницах."""
+    page_cache.invalidate_on_commit(page_cache.SITE, using=using)
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_category_posts(sender, instance, signal, **kwargs):
+    """Обновляет версию карточек постов категории."""
+    if signal is post_save and not _card_fields_changed(instance):
+        return
+    Post.objects.filter(category=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def touch_location_posts(sender, instance, signal, **kwargs):
+    """Обновляет версию карточек постов с этим местоположением."""
+    if signal is post_save and not _card_fields_changed(instance):
+        return
+    Post.objects.filter(location=instance).update(updated_at=timezone.now())
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_category(sender, instance, update_fields, **kwargs):
+    """Запоминает прежнюю категорию, чтобы сбросить и её страницы."""
+    instance._stored_category_id = _stored_value(
+        sender, instance, 'category_id', update_fields
+    )
+
+
+@receiver(post_save, sender=Post)
+def schedule_publication(sender, instance, using, **kwargs):
+    """Отложенный пост должен появиться в ленте вовремя.
+
+    Границу сбрасываем после фиксации: иначе другой процесс успеет
+    пересчитать её, ещё не видя поста.
+    """
+    transaction.on_commit(
+        partial(scheduling.schedule, instance.pub_date), using=using
+    )
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, using, update_fields, **kwargs):
+    """Обновляет пост в поисковом индексе."""
+    if update_fields and not {'title', 'text'} & set(update_fields):
+        return
+    search.index_post(instance.pk, using)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, using, **kwargs):
+    """Убирает удалённый пост из поискового индекса."""
+    search.remove_post(instance.pk, using)
+
+
+@receiver(post_save, sender=Post)
+def update_image_renditions(sender, instance, update_fields, **kwargs):
+    """Ставит в очередь построение копий нового фото."""
+    if update_fields and 'image' not in update_fields:
+        return
+    if 'image' in instance.get_deferred_fields():
+        return
+    if instance.image.name != instance.image_renditions.get('source', ''):
+        enqueue(
+            tasks.build_renditions,
+            instance.pk,
+            key=f'renditions:{instance.pk}'
+        )
+
+
+@receiver(post_delete, sender=Post)
+def delete_image_renditions(sender, instance, using, **kwargs):
+    """Удаляет копии фото удалённого поста после фиксации удаления."""
+    transaction.on_commit(
+        partial(renditions.delete_renditions, instance.image_renditions),
+        using=using
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, using, **kwargs):
+    """Сбрасывает кэш страниц, на которых выводится пост."""
+    page_cache.invalidate_on_commit(
+        page_cache.category_group(
+            getattr(instance, '_stored_category_id', None)
+        ),
+        *page_cache.post_groups(
+            instance.pk, instance.category_id, instance.author_id
+        ),
+        using=using
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, using, **kwargs):
+    """Комментарии и их количество выводятся в ленте и на странице поста.
+
+    При удалении поста его страницы сбрасывает invalidate_post_pages, а
+    при удалении автора — invalidate_author_pages.
+    """
+    if _parent_deleted(instance):
+        return
+    post = Post.objects.using(using).filter(pk=instance.post_id).values_list(
+        'category_id', 'author_id'
+    ).first()
+    if post is not None:
+        page_cache.invalidate_on_commit(
+            *page_cache.post_groups(instance.post_id, *post), using=using
+        )
+
+
+@receiver(post_delete, sender=User)
+def invalidate_author_pages(sender, instance, using, **kwargs):
+    """Комментарии удалённого автора могли быть на любых страницах."""
+    page_cache.invalidate_on_commit(page_cache.SITE, using=using)
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, update_fields, **kwargs):
+    """Запоминает прежний username, чтобы сбросить его из кэша."""
+    instance._stored_username = _stored_value(
+        sender, instance, 'username', update_fields
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_profile(sender, instance, using, **kwargs):
+    """Сбрасывает закэшированный профиль после фиксации."""
+    stored_username = getattr(instance, '_stored_username', None)
+    transaction.on_commit(partial(
+        lookups.forget_profile,
+        instance.username, *filter(None, [stored_username])
+    ), using=using)
+    if stored_username and stored_username != instance.username:
+        Post.objects.filter(author=instance).update(
+            updated_at=timezone.now()
+        )
+        page_cache.invalidate_on_commit(page_cache.SITE, using=using)
@@ -0,0 +1,43 @@
+"""Фоновые задачи приложения blog."""
+from urllib.parse import urlsplit
+
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest, QueryDict
+from django.urls import resolve
+
+from jobs.queue import task
+
+from . import renditions
+
+
+@task
+def build_renditions(post_id):
+    """Строит уменьшенные копии фото поста."""
+    renditions.update_post(post_id)
+
+
+def make_request(path, user=None):
+    """GET-запрос к path вне обработчика Django."""
+    url = urlsplit(path)
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = url.path
+    request.META['QUERY_STRING'] = url.query
+    request.GET = QueryDict(url.query)
+    request.user = user or AnonymousUser()
+    return request
+
+
+@task
+def warm_pages(*paths):
+    """Заполняет кэш страниц для анонимных пользователей.
+
+    Задачу выполняет отдельный процесс, поэтому прогрев полезен только
+    с общим для процессов кэшем (см. проверку blog.W001).
+    """
+    for path in paths:
+        request = make_request(path)
+        match = resolve(request.path_info)
+        response = match.func(request, *match.args, **match.kwargs)
+        if hasattr(response, 'render'):
+            response.render()
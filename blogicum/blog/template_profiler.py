@@ -0,0 +1,158 @@
+"""Разбивка времени рендеринга по шаблонам и узлам шаблонов.
+
+Профилировщик подменяет Node.render_annotated и Template.render движка
+Django. Подмена ставится функцией install только по требованию: пока
+профиль не запущен, обёртки сразу вызывают исходные методы. Время узла
+считается полным (с вложенными узлами) и собственным, время шаблона
+включает вложенные через include шаблоны.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.template.base import Node, Template
+
+_active = ContextVar('blog_template_profile', default=None)
+_originals = {}
+_install_lock = threading.Lock()
+_running = 0
+
+
+class Profile:
+    """Накопленные замеры одного профиля."""
+
+    def __init__(self):
+        self.nodes = {}
+        self.templates = {}
+        self.render_time = 0.0
+        self._stacks = {'nodes': [], 'templates': []}
+
+    def measure(self, table, key, func, *args):
+        stack = self._stacks[table]
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            elif table == 'templates':
+                self.render_time += elapsed
+            stats = getattr(self, table).setdefault(key, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] += elapsed - children
+
+    @staticmethod
+    def _rows(table, fields, limit=None, runs=1):
+        rows = [
+            {
+                **dict(zip(fields, key)),
+                'calls': round(calls / runs, 2),
+                'total_ms': round(total * 1000 / runs, 4),
+                'self_ms': round(own * 1000 / runs, 4),
+            }
+            for key, (calls, total, own) in table.items()
+        ]
+        rows.sort(key=lambda row: row['self_ms'], reverse=True)
+        return rows[:limit]
+
+    def report(self, limit=30, runs=1):
+        """Шаблоны и самые долгие по собственному времени узлы.
+
+        При runs > 1 значения делятся на число профилированных рендерингов.
+        """
+        return {
+            'render_ms': round(self.render_time * 1000 / runs, 4),
+            'templates': self._rows(
+                self.templates, ('template',), runs=runs
+            ),
+            'nodes': self._rows(
+                self.nodes, ('template', 'line', 'node', 'source'),
+                limit, runs
+            ),
+        }
+
+
+def node_key(node):
+    origin = getattr(node, 'origin', None)
+    token = getattr(node, 'token', None)
+    return (
+        origin.template_name or origin.name if origin else None,
+        token.lineno if token else None,
+        type(node).__name__,
+        token.contents[:60] if token else '',
+    )
+
+
+def _render_annotated(self, context):
+    profile = _active.get()
+    if profile is None:
+        return _originals['render_annotated'](self, context)
+    return profile.measure(
+        'nodes', node_key(self), _originals['render_annotated'], self, context
+    )
+
+
+def _template_render(self, context):
+    profile = _active.get()
+    if profile is None:
+        return _originals['render'](self, context)
+    return profile.measure(
+        'templates', (self.origin.template_name or self.name,),
+        _originals['render'], self, context
+    )
+
+
+def _patch():
+    if _originals:
+        return
+    _originals['render_annotated'] = Node.render_annotated
+    _originals['render'] = Template.render
+    Node.render_annotated = _render_annotated
+    Template.render = _template_render
+
+
+def _restore():
+    if not _originals:
+        return
+    Node.render_annotated = _originals.pop('render_annotated')
+    Template.render = _originals.pop('render')
+
+
+def install():
+    """Подменяет методы движка шаблонов; повторный вызов ничего не делает."""
+    with _install_lock:
+        _patch()
+
+
+def uninstall():
+    with _install_lock:
+        _restore()
+
+
+def uninstall_if_idle():
+    """Снимает подмену, если ни один профиль сейчас не запущен."""
+    with _install_lock:
+        if not _running:
+            _restore()
+
+
+@contextmanager
+def profile():
+    """Профилирует рендеринг шаблонов внутри блока with."""
+    global _running
+    with _install_lock:
+        _patch()
+        _running += 1
+    current = Profile()
+    token = _active.set(current)
+    try:
+        yield current
+    finally:
+        _active.reset(token)
+        with _install_lock:
+            _running -= 1
@@ -0,0 +1,94 @@
+"""Приём загружаемых фотографий с ограниченным расходом памяти.
+
+Загрузки пишутся на диск, данные сверх IMAGE_UPLOAD_MAX_BYTES не
+сохраняются. Размер изображения проверяется по заголовку до
+декодирования, а перед сохранением фото поворачивается по EXIF,
+уменьшается до IMAGE_MAX_DIMENSION и записывается без метаданных.
+"""
+import threading
+from pathlib import PurePath
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from PIL import Image, ImageOps
+
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 90},
+    'WEBP': {'quality': 90},
+    'PNG': {},
+}
+FALLBACK_FORMAT = 'PNG'
+
+_decoding = threading.BoundedSemaphore(settings.IMAGE_PROCESSING_CONCURRENCY)
+
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """Пишет файл на диск, отбрасывая данные сверх лимита.
+
+    Размер файла при этом остаётся полным, чтобы форма могла отклонить
+    слишком большую загрузку.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received <= settings.IMAGE_UPLOAD_MAX_BYTES:
+            self.file.write(raw_data)
+
+
+def pixel_count(file):
+    """Количество пикселей по заголовку файла, без декодирования."""
+    file.seek(0)
+    with Image.open(file) as image:
+        width, height = image.size
+    file.seek(0)
+    return width * height
+
+
+def _needs_processing(image, max_dimension):
+    return max(image.size) > max_dimension or bool(image.getexif())
+
+
+def prepare_image(uploaded):
+    """Возвращает загрузку, готовую к сохранению.
+
+    Фото без EXIF и не больше IMAGE_MAX_DIMENSION возвращается как есть,
+    анимированные изображения не обрабатываются.
+    """
+    max_dimension = settings.IMAGE_MAX_DIMENSION
+    with _decoding:
+        uploaded.seek(0)
+        with Image.open(uploaded) as source:
+            if getattr(source, 'is_animated', False) or (
+                    not _needs_processing(source, max_dimension)):
+                uploaded.seek(0)
+                return uploaded
+            image_format = source.format
+            name = uploaded.name
+            if image_format not in SAVE_OPTIONS:
+                image_format = FALLBACK_FORMAT
+                name = str(PurePath(name).with_suffix('.png'))
+            icc_profile = source.info.get('icc_profile')
+            # JPEG декодируется сразу в уменьшенном масштабе.
+            source.draft(source.mode, (max_dimension, max_dimension))
+            image = ImageOps.exif_transpose(source)
+        image.thumbnail(
+            (max_dimension, max_dimension), Image.Resampling.LANCZOS
+        )
+        if image_format == 'JPEG' and image.mode not in ('RGB', 'L', 'CMYK'):
+            image = image.convert('RGB')
+        output = TemporaryUploadedFile(
+            name, Image.MIME[image_format], 0, None
+        )
+        options = dict(SAVE_OPTIONS[image_format])
+        if icc_profile:
+            options['icc_profile'] = icc_profile
+        image.save(output, image_format, **options)
+    output.size = output.tell()
+    output.seek(0)
+    output.image = image
+    return output
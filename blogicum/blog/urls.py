@@ -20,6 +20,9 @@ post_urls = [
         '<int:post_id>/delete/',
         views.PostDeleteView.as_view(),
         name='delete_post'),
+    path('<int:post_id>/comments/',
+         views.comments_fragment,
+         name='comments'),
     path('<int:post_id>/comment/',
          views.add_comment,
          name='add_comment'),
@@ -44,6 +47,8 @@ profile_urls = [
 
 urlpatterns = [
     path('', views.PostsList.as_view(), name='index'),
+    path('search/', views.SearchView.as_view(), name='search'),
+    path('stats/queries/', views.query_stats, name='query_stats'),
     path('posts/', include(post_urls)),
     path('profile/', include(profile_urls)),
     path(
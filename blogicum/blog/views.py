@@ -1,47 +1,76 @@
 """Views.py для приложения blog."""
 from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
 from django.views.generic import CreateView, DeleteView, DetailView
 from django.views.generic import ListView, UpdateView
 
+from . import lookups, metrics, search
 from .forms import CommentForm, PostForm, UserForm
-from .mixins import OnlyAuthorMixin
-from .models import Category, Comment, Post, User
-from .query_utils import get_posts
-
-
-class PostDetailView(DetailView):
+from . import page_cache
+from .mixins import (
+    AnonymousPageCacheMixin,
+    CachedObjectMixin,
+    CursorPaginationMixin,
+    OnlyAuthorMixin,
+    QueuedWriteMixin,
+    ReplicaReadMixin,
+)
+from .models import Comment, Post, User
+from .pagination import CursorPaginator
+from .write_queue import run_write
+from .query_utils import get_posts, visible_posts_filter
+
+
+def get_comments_page(post, cursor=None):
+    """Возвращает порцию комментариев поста вместе с авторами."""
+    paginator = CursorPaginator(
+        Comment.objects.select_related('author').filter(post=post),
+        settings.NUMBER_OF_COMMENTS,
+        ordering=('created_at', 'id')
+    )
+    try:
+        return paginator.page(cursor)
+    except InvalidPage as error:
+        raise Http404(str(error))
+
+
+class PostDetailView(
+        AnonymousPageCacheMixin, ReplicaReadMixin, CachedObjectMixin,
+        DetailView):
     """CBV вывода отдельных постов."""
 
     model = Post
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
 
-    def get_object(self):
-        post = get_object_or_404(
-            get_posts(),
-            pk=self.kwargs[self.pk_url_kwarg]
+    def get_cache_groups(self):
+        return (
+            page_cache.SITE,
+            page_cache.post_group(self.kwargs[self.pk_url_kwarg])
         )
-        if post.author != self.request.user:
-            post = get_object_or_404(
-                get_posts(filter_flag=True),
-                pk=self.kwargs[self.pk_url_kwarg]
-            )
-        return post
+
+    def get_queryset(self):
+        return get_posts().filter(visible_posts_filter(self.request.user))
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = Comment.objects.all().filter(
-            post=self.get_object()
-        ).order_by('created_at')
+        context['comments'] = get_comments_page(
+            self.object,
+            self.request.GET.get('comments')
+        )
         return context
 
 
-class PostsList(ListView):
+class PostsList(
+        AnonymousPageCacheMixin, ReplicaReadMixin, CursorPaginationMixin,
+        ListView):
     """CBV вывода постов на главную страницу."""
 
     model = Post
@@ -49,11 +78,19 @@ class PostsList(ListView):
     template_name = 'blog/index.html'
     paginate_by = settings.NUMBER_OF_POSTS
 
+    def get_cache_groups(self):
+        return (page_cache.SITE, page_cache.FEED)
+
+    def get_count_key(self):
+        return page_cache.count_key(page_cache.FEED)
+
     def get_queryset(self):
-        return get_posts(filter_flag=True, annotate_flag=True)
+        return get_posts(filter_flag=True, defer_flag=True)
 
 
-class CategoryList(ListView):
+class CategoryList(
+        AnonymousPageCacheMixin, ReplicaReadMixin, CursorPaginationMixin,
+        ListView):
     """CBV вывода постов в категории."""
 
     model = Post
@@ -62,10 +99,20 @@ class CategoryList(ListView):
     paginate_by = settings.NUMBER_OF_POSTS
 
     def get_category(self):
-        return get_object_or_404(
-            Category,
-            slug=self.kwargs['category_slug'],
-            is_published=True
+        return lookups.get_category(
+            self.request,
+            self.kwargs['category_slug']
+        )
+
+    def get_cache_groups(self):
+        return (
+            page_cache.SITE,
+            page_cache.category_group(self.get_category().pk)
+        )
+
+    def get_count_key(self):
+        return page_cache.count_key(
+            page_cache.category_group(self.get_category().pk)
         )
 
     def get_queryset(self):
@@ -73,7 +120,7 @@ class CategoryList(ListView):
         return get_posts(
             manager=category.posts,
             filter_flag=True,
-            annotate_flag=True
+            defer_flag=True
         )
 
     def get_context_data(self, **kwargs):
@@ -82,7 +129,9 @@ class CategoryList(ListView):
         return context
 
 
-class ProfileList(ListView):
+class ProfileList(
+        AnonymousPageCacheMixin, ReplicaReadMixin, CursorPaginationMixin,
+        ListView):
     """CBV вывода постов на странице профиле пользователя."""
 
     model = Post
@@ -91,9 +140,18 @@ class ProfileList(ListView):
     paginate_by = settings.NUMBER_OF_POSTS
 
     def get_user(self):
-        return get_object_or_404(
-            User,
-            username=self.kwargs['username']
+        return lookups.get_profile(self.request, self.kwargs['username'])
+
+    def get_cache_groups(self):
+        return (
+            page_cache.SITE,
+            page_cache.profile_group(self.get_user().pk)
+        )
+
+    def get_count_key(self):
+        return page_cache.count_key(
+            page_cache.profile_group(self.get_user().pk),
+            'own' if self.request.user == self.get_user() else 'public'
         )
 
     def get_queryset(self):
@@ -101,7 +159,7 @@ class ProfileList(ListView):
         return get_posts(
             manager=profile.posts,
             filter_flag=not self.request.user == profile,
-            annotate_flag=True
+            defer_flag=True
         )
 
     def get_context_data(self, **kwargs):
@@ -110,7 +168,37 @@ class ProfileList(ListView):
         return context
 
 
-class PostCreateView(LoginRequiredMixin, CreateView):
+class SearchView(ReplicaReadMixin, ListView):
+    """CBV полнотекстового поиска по опубликованным постам."""
+
+    context_object_name = 'post_obj'
+    template_name = 'blog/search.html'
+    paginate_by = settings.NUMBER_OF_POSTS
+
+    def get_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        return search.search_posts(
+            get_posts(filter_flag=True, defer_flag=True),
+            self.get_query()
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = CursorPaginator(queryset, page_size, search.ORDERING)
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.get_query()
+        return context
+
+
+class PostCreateView(LoginRequiredMixin, QueuedWriteMixin, CreateView):
     """CBV создания поста."""
 
     model = Post
@@ -122,7 +210,8 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 
-class PostUpdateView(OnlyAuthorMixin, UpdateView):
+class PostUpdateView(
+        OnlyAuthorMixin, CachedObjectMixin, QueuedWriteMixin, UpdateView):
     """CBV редактирования поста."""
 
     model = Post
@@ -137,7 +226,8 @@ class PostUpdateView(OnlyAuthorMixin, UpdateView):
         )
 
 
-class PostDeleteView(OnlyAuthorMixin, DeleteView):
+class PostDeleteView(
+        OnlyAuthorMixin, CachedObjectMixin, QueuedWriteMixin, DeleteView):
     """CBV удаления поста."""
 
     model = Post
@@ -147,8 +237,7 @@ class PostDeleteView(OnlyAuthorMixin, DeleteView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        instance = self.get_object()
-        form = PostForm(instance=instance)
+        form = PostForm(instance=self.object)
         context['form'] = form
         return context
 
@@ -156,7 +245,7 @@ class PostDeleteView(OnlyAuthorMixin, DeleteView):
         return reverse('blog:profile', kwargs={'username': self.request.user})
 
 
-class ProfileUpdateView(LoginRequiredMixin, UpdateView):
+class ProfileUpdateView(LoginRequiredMixin, QueuedWriteMixin, UpdateView):
     """CBV редактирования профиля."""
 
     model = User
@@ -174,6 +263,19 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         )
 
 
+def comments_fragment(request, post_id):
+    """Функция вывода следующей порции комментариев в виде HTML."""
+    post = get_object_or_404(
+        Post.objects.filter(visible_posts_filter(request.user)),
+        pk=post_id
+    )
+    context = {
+        'post': post,
+        'comments': get_comments_page(post, request.GET.get('cursor')),
+    }
+    return render(request, 'includes/comment_list.html', context)
+
+
 @login_required
 def add_comment(request, post_id):
     """Функция для добавления комментариев."""
@@ -183,7 +285,7 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        run_write(comment.save)
     return redirect('blog:post_detail', post_id=post_id)
 
 
@@ -194,7 +296,7 @@ def edit_comment(request, post_id, comment_id):
     form = CommentForm(request.POST or None, instance=instance)
     context = {'form': form, 'comment': instance}
     if form.is_valid() and request.user == instance.author:
-        form.save()
+        run_write(form.save)
         return redirect('blog:post_detail', post_id=post_id)
     elif request.user != instance.author:
         return redirect('blog:post_detail', post_id=post_id)
@@ -209,6 +311,12 @@ def delete_comment(request, post_id, comment_id):
     if request.user != instance.author:
         return redirect('blog:post_detail', post_id=post_id)
     if request.method == 'POST' and request.user == instance.author:
-        instance.delete()
+        run_write(instance.delete)
         return redirect('blog:post_detail', post_id=post_id)
     return render(request, 'blog/comment.html', context)
+
+
+@staff_member_required
+def query_stats(request):
+    """Функция вывода итогов по SQL-запросам представлений в JSON."""
+    return JsonResponse(metrics.snapshot(), json_dumps_params={'indent': 2})
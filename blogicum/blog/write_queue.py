@@ -0,0 +1,117 @@
+"""Очередь записи в базу с единственным пишущим потоком.
+
+SQLite допускает одного писателя, поэтому при включённом WRITE_QUEUE
+записи из всех потоков выполняются в одном фоновом потоке. Подряд
+пришедшие записи объединяются в одну транзакцию, каждая — в своей точке
+сохранения, так что ошибка одной не откатывает остальные. Вызывающий
+поток получает результат только после фиксации транзакции.
+
+В очередь ставится только запись в базу: новые файлы модели сохраняются
+заранее функцией save_files, а сигналы сбрасывают кэш после фиксации.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.db import close_old_connections, connection, models, transaction
+
+
+class WriteQueue:
+    """Пишущий поток, выполняющий задания пачками."""
+
+    def __init__(self, batch_size, batch_wait):
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args, **kwargs):
+        """Выполняет func в пишущем потоке и возвращает её результат."""
+        if threading.current_thread() is self._thread:
+            return func(*args, **kwargs)
+        self._start()
+        future = Future()
+        self._queue.put((future, func, args, kwargs))
+        return future.result()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='blog-write-queue', daemon=True
+                )
+                self._thread.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            close_old_connections()
+            try:
+                outcomes = self._commit(batch)
+            except Exception as error:
+                outcomes = [(None, error)] * len(batch)
+            for (future, *_), (result, error) in zip(batch, outcomes):
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
+
+    def _commit(self, batch):
+        outcomes = []
+        with transaction.atomic():
+            for _, func, args, kwargs in batch:
+                try:
+                    with transaction.atomic():
+                        outcomes.append((func(*args, **kwargs), None))
+                except Exception as error:
+                    outcomes.append((None, error))
+        return outcomes
+
+
+_write_queue = WriteQueue(
+    settings.WRITE_QUEUE_BATCH_SIZE,
+    settings.WRITE_QUEUE_BATCH_WAIT
+)
+
+
+def save_files(instance):
+    """Сохраняет в хранилище новые файлы модели.
+
+    Вызывается до run_write, чтобы пишущий поток не держал блокировку
+    базы, пока файл записывается на диск. FileField.pre_save уже
+    сохранённые файлы повторно не пишет.
+    """
+    for field in instance._meta.concrete_fields:
+        if not isinstance(field, models.FileField):
+            continue
+        file = getattr(instance, field.attname)
+        if file and not file._committed:
+            file.save(file.name, file.file, save=False)
+
+
+def run_write(func, *args, **kwargs):
+    """Выполняет запись в транзакции, через очередь, если она включена.
+
+    Внутри уже открытой транзакции запись выполняется на месте: пишущий
+    поток ждал бы блокировку, которую держит вызывающий поток.
+    """
+    if settings.WRITE_QUEUE and not connection.in_atomic_block:
+        return _write_queue.submit(func, *args, **kwargs)
+    with transaction.atomic():
+        return func(*args, **kwargs)
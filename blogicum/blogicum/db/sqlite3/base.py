@@ -0,0 +1,26 @@
+"""SQLite с настройкой соединения из settings."""
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+
+def apply_pragmas(connection, pragmas):
+    """Выполняет PRAGMA для нового соединения."""
+    for name, value in pragmas.items():
+        connection.execute(f'PRAGMA {name} = {value}')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Применяет SQLITE_PRAGMAS при подключении.
+
+    Транзакции открываются в режиме SQLITE_TRANSACTION_MODE: IMMEDIATE
+    сразу берёт блокировку на запись и не падает с «database is locked»
+    при попытке повысить блокировку чтения посреди транзакции.
+    """
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        apply_pragmas(connection, settings.SQLITE_PRAGMAS)
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {settings.SQLITE_TRANSACTION_MODE}')
@@ -0,0 +1,154 @@
+"""Раздача загруженных файлов без DEBUG.
+
+Поддерживаются условные запросы по ETag и Last-Modified, диапазоны байт
+и передача файла фронтенд-прокси через X-Sendfile или X-Accel-Redirect
+(настройка MEDIA_SENDFILE). Файлы с хэшем содержимого в имени кэшируются
+клиентами на год.
+"""
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, StreamingHttpResponse
+)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+CHUNK_SIZE = 64 * 1024
+
+
+def _stat(root, path):
+    try:
+        full_path = safe_join(root, path)
+        file_stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        raise Http404('Файл не найден.')
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404('Файл не найден.')
+    return full_path, file_stat
+
+
+def parse_range(header, size):
+    """Границы единственного диапазона байт или None, если их нет.
+
+    Несколько диапазонов не поддерживаются: для них отдаётся весь файл.
+    Для неудовлетворимого диапазона возвращается ().
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if match is None or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        length = min(int(last), size)
+        return (size - length, size - 1) if length else ()
+    first = int(first)
+    last = min(int(last), size - 1) if last else size - 1
+    if first > last:
+        return ()
+    return first, last
+
+
+def _range_matches(request, etag, last_modified):
+    if_range = request.headers.get('If-Range')
+    if if_range is None:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def _read_range(full_path, first, length):
+    with open(full_path, 'rb') as file:
+        file.seek(first)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _offload(response, path, full_path):
+    mode = settings.MEDIA_SENDFILE
+    if mode == 'x-sendfile':
+        response['X-Sendfile'] = full_path
+    elif mode == 'x-accel-redirect':
+        prefix = settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/')
+        response['X-Accel-Redirect'] = f'{prefix}/{quote(path)}'
+    return response
+
+
+def _body_response(request, path, full_path, size, byte_range,
+                   content_type):
+    if byte_range == ():
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if settings.MEDIA_SENDFILE:
+        return _offload(
+            HttpResponse(content_type=content_type), path, full_path
+        )
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+        response['Content-Length'] = size
+        return response
+    if byte_range is not None:
+        first, last = byte_range
+        response = StreamingHttpResponse(
+            _read_range(full_path, first, last - first + 1),
+            status=206,
+            content_type=content_type
+        )
+        response['Content-Length'] = last - first + 1
+        response['Content-Range'] = f'bytes {first}-{last}/{size}'
+        return response
+    return FileResponse(open(full_path, 'rb'), content_type=content_type)
+
+
+def serve_path(request, root, path, content_type=None, headers=None):
+    """Отдаёт файл path из каталога root с учётом заголовков запроса."""
+    full_path, file_stat = _stat(root, path)
+    size = file_stat.st_size
+    last_modified = int(file_stat.st_mtime)
+    etag = f'"{file_stat.st_mtime_ns:x}-{size:x}"'
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        if content_type is None:
+            content_type, encoding = mimetypes.guess_type(full_path)
+            if encoding or content_type is None:
+                content_type = 'application/octet-stream'
+        byte_range = None
+        if ('Range' in request.headers
+                and _range_matches(request, etag, last_modified)):
+            byte_range = parse_range(request.headers['Range'], size)
+        response = _body_response(
+            request, path, full_path, size, byte_range, content_type
+        )
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = (
+        IMMUTABLE if HASHED_NAME_RE.search(path)
+        else f'public, max-age={settings.MEDIA_MAX_AGE}'
+    )
+    for name, value in (headers or {}).items():
+        response[name] = value
+    return response
+
+
+@require_safe
+def serve(request, path):
+    """Функция раздачи файлов из MEDIA_ROOT."""
+    return serve_path(request, settings.MEDIA_ROOT, path)
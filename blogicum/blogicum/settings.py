@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -41,6 +43,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'blog.apps.BlogConfig',
+    'jobs.apps.JobsConfig',
     'pages.apps.PagesConfig',
     'debug_toolbar',
     'django_bootstrap5',
@@ -53,13 +56,16 @@ INTERNAL_IPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'blog.middleware.QueryMetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blog.middleware.TemplateProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
+    'blog.middleware.ReplicaPinMiddleware',
 ]
 
 ROOT_URLCONF = 'blogicum.urls'
@@ -72,7 +78,7 @@ STATICFILES_DIRS = [
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'blog.metrics.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -81,6 +87,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'blog.context_processors.fragment_cache',
             ],
         },
     },
@@ -92,13 +99,87 @@ WSGI_APPLICATION = 'blogicum.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# BLOGICUM_DB_PATH points the project at another database file, e.g. a
+# dataset generated for `manage.py bench_http`.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': 'blogicum.db.sqlite3',
+        'NAME': os.environ.get('BLOGICUM_DB_PATH', BASE_DIR / 'db.sqlite3'),
     }
 }
 
+# Read replicas: comma-separated paths to copies of the default database,
+# refreshed by `manage.py sync_replicas`.
+DATABASE_REPLICAS = []
+
+for number, path in enumerate(
+        filter(None, os.environ.get('BLOGICUM_REPLICA_DBS', '').split(',')),
+        start=1):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        'ENGINE': 'blogicum.db.sqlite3',
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+
+REPLICA_PIN_SECONDS = 10
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+SQLITE_TRANSACTION_MODE = 'IMMEDIATE'
+
+WRITE_QUEUE = False
+
+WRITE_QUEUE_BATCH_SIZE = 50
+
+WRITE_QUEUE_BATCH_WAIT = 0.005
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+# Page-cache generations, the publication cutoff and cached lookups are
+# shared state: web workers, run_jobs and management commands must all see
+# the same cache. The file-based backend is shared by every process on the
+# host; use memcached or redis when running on several hosts. A
+# process-local backend (locmem, dummy) triggers the blog.W001 check.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get(
+            'BLOGICUM_CACHE_DIR',
+            os.path.join(tempfile.gettempdir(), 'blogicum-cache')
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+LOOKUP_CACHE_TIMEOUT = 60 * 15
+
+PAGE_CACHE_TIMEOUT = 60 * 10
+
+# Page cache hit/miss counters are kept per process and added to the
+# shared cache at most this often, so a cache hit writes nothing.
+PAGE_CACHE_STATS_INTERVAL = 60
+
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Upper bound on how late a scheduled post may appear if a process missed
+# the reschedule, e.g. after a cache outage.
+PUBLICATION_STATE_TIMEOUT = 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -138,6 +219,15 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+STATIC_ROOT = BASE_DIR / 'static'
+
+# Content-hashed names with .gz/.br copies, built by collectstatic and
+# served by blogicum.static when DEBUG is off
+if not DEBUG:
+    STATICFILES_STORAGE = (
+        'blogicum.storage.CompressedManifestStaticFilesStorage'
+    )
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -147,6 +237,37 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 MEDIA_URL = 'media/'
 
+# Cache lifetime of media files without a content hash in the name
+MEDIA_MAX_AGE = 3600
+# Hand media files to the front proxy: None, 'x-sendfile' or
+# 'x-accel-redirect' (nginx internal location at MEDIA_ACCEL_REDIRECT_PREFIX)
+MEDIA_SENDFILE = None
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
+# Background jobs stored in the project database, see jobs.queue
+JOBS_VISIBILITY_TIMEOUT = 300
+JOBS_MAX_ATTEMPTS = 3
+JOBS_RETRY_DELAY = 10
+JOBS_POLL_INTERVAL = 1.0
+# Backend the worker uses for mail queued by jobs.mail.EmailBackend
+JOBS_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+
+# Uploads are written to disk; bytes past IMAGE_UPLOAD_MAX_BYTES are dropped
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'blog.uploads.LimitedTemporaryFileUploadHandler',
+]
+IMAGE_UPLOAD_MAX_BYTES = 25 * 2 ** 20
+# Checked against the image header before any pixels are decoded
+IMAGE_MAX_PIXELS = 60_000_000
+# Longest side of a stored original
+IMAGE_MAX_DIMENSION = 2560
+# Images decoded at the same time per process
+IMAGE_PROCESSING_CONCURRENCY = 2
+
+# Widths of the downscaled copies generated for post images
+IMAGE_RENDITION_WIDTHS = (320, 640, 1280)
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
@@ -158,3 +279,62 @@ LOGIN_URL = 'login'
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 
 NUMBER_OF_POSTS = 10
+
+NUMBER_OF_COMMENTS = 50
+
+MAX_PAGE_NUMBER = 50
+
+# Per-request SQL metrics, see blog.metrics; totals at /stats/queries/
+QUERY_METRICS = True
+QUERY_METRICS_LOG_INTERVAL = 300
+# Queries allowed per request before a warning is logged, by view name.
+# Write views are budgeted for a valid POST with an image and a location:
+# the form checks both foreign keys, saves the post and its search index
+# and queues the image renditions job.
+QUERY_BUDGETS = {
+    'blog:index': 6,
+    'blog:category_posts': 6,
+    'blog:profile': 6,
+    'blog:post_detail': 6,
+    'blog:comments': 5,
+    'blog:search': 4,
+    'blog:create_post': 14,
+    'blog:edit_post': 16,
+    'blog:delete_post': 9,
+    'blog:edit_profile': 9,
+    'blog:add_comment': 8,
+    'blog:edit_comment': 8,
+    'blog:delete_comment': 9,
+    'blog:query_stats': 2,
+    'pages:about': 2,
+    'pages:rules': 2,
+}
+
+# Periodic metrics totals are logged at INFO, below the level Python logs
+# by default, so blog.metrics gets its own console handler.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'metrics': {
+            'format': '{asctime} {levelname} {name}: {message}',
+            'style': '{',
+        },
+    },
+    'handlers': {
+        'metrics': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'metrics',
+        },
+    },
+    'loggers': {
+        'blog.metrics': {
+            'handlers': ['metrics'],
+            'level': 'INFO',
+        },
+    },
+}
+
+# Staff can append ?profile_templates to a page to get its render time
+# broken down by template node, see blog.template_profiler
+TEMPLATE_PROFILER = False
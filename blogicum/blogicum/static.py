@@ -0,0 +1,49 @@
+"""Раздача собранной статики со сжатыми копиями файлов."""
+import mimetypes
+import os
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import require_safe
+
+from .media import HASHED_NAME_RE, IMMUTABLE, serve_path
+from .storage import COMPRESSIBLE_EXTENSIONS
+
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def accepted_encodings(request):
+    return {
+        part.split(';')[0].strip().lower()
+        for part in request.headers.get('Accept-Encoding', '').split(',')
+    }
+
+
+@require_safe
+def serve(request, path):
+    """Функция раздачи файлов из STATIC_ROOT.
+
+    Если клиент принимает brotli или gzip и рядом лежит сжатая копия,
+    отдаётся она. Файлы с хэшем в имени кэшируются клиентами на год.
+    """
+    headers = {}
+    if HASHED_NAME_RE.search(path):
+        headers['Cache-Control'] = IMMUTABLE
+    content_type = None
+    served_path = path
+    if path.endswith(COMPRESSIBLE_EXTENSIONS):
+        content_type = mimetypes.guess_type(path)[0]
+        accepted = accepted_encodings(request)
+        for encoding, extension in ENCODINGS:
+            if encoding in accepted and os.path.isfile(
+                    os.path.join(settings.STATIC_ROOT, path + extension)):
+                served_path = path + extension
+                headers['Content-Encoding'] = encoding
+                break
+    response = serve_path(
+        request, settings.STATIC_ROOT, served_path,
+        content_type=content_type, headers=headers
+    )
+    if path.endswith(COMPRESSIBLE_EXTENSIONS):
+        patch_vary_headers(response, ('Accept-Encoding',))
+    return response
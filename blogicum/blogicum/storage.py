@@ -0,0 +1,47 @@
+"""Хранилище статики с хэшами в именах и сжатыми копиями файлов."""
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.json', '.map', '.svg', '.txt', '.xml', '.ico',
+)
+
+
+def compressors():
+    """Расширения сжатых копий и функции сжатия."""
+    yield '.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield '.br', lambda data: brotli.compress(data, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Рядом с каждым хэшированным текстовым файлом кладёт .gz и .br.
+
+    Сжатая копия сохраняется, только если она меньше исходного файла.
+    """
+
+    def post_process(self, *args, **kwargs):
+        for name, hashed_name, processed in super().post_process(
+                *args, **kwargs):
+            if isinstance(processed, Exception) or hashed_name is None:
+                yield name, hashed_name, processed
+                continue
+            if hashed_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress(hashed_name)
+            yield name, hashed_name, processed
+
+    def compress(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as file:
+            data = file.read()
+        for extension, compress in compressors():
+            compressed = compress(data)
+            if len(compressed) < len(data):
+                with open(path + extension, 'wb') as file:
+                    file.write(compressed)
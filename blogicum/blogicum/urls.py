@@ -3,7 +3,8 @@ from django.conf import settings
 from django.urls import include, path, reverse_lazy
 from django.contrib.auth.forms import UserCreationForm
 from django.views.generic.edit import CreateView
-from django.conf.urls.static import static
+
+from . import media, static
 
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_error'
@@ -23,7 +24,12 @@ urlpatterns = [
         name='registration',
     ),
     path('pages/', include('pages.urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path(f'{settings.MEDIA_URL.strip("/")}/<path:path>', media.serve),
+]
+if not settings.DEBUG:
+    urlpatterns += (
+        path(f'{settings.STATIC_URL.strip("/")}/<path:path>', static.serve),
+    )
 if settings.DEBUG:
     import debug_toolbar
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
@@ -0,0 +1,60 @@
+from django.contrib import admin
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Job
+
+
+@admin.action(description='Поставить в очередь повторно')
+def retry_jobs(modeladmin, request, queryset):
+    """Возвращает упавшие задания в очередь.
+
+    Задание, чей ключ уже занят заданием в очереди, удаляется, как это
+    делает queue.fail: второе такое задание не нужно.
+    """
+    failed = list(
+        queryset.filter(status=Job.FAILED).order_by('-pk').values_list(
+            'pk', 'key'
+        )
+    )
+    taken = set(Job.objects.filter(
+        status=Job.QUEUED, key__in={key for _, key in failed if key}
+    ).values_list('key', flat=True))
+    retry, duplicates = [], []
+    for pk, key in failed:
+        if key in taken:
+            duplicates.append(pk)
+            continue
+        retry.append(pk)
+        if key:
+            taken.add(key)
+    with transaction.atomic():
+        Job.objects.filter(pk__in=duplicates).delete()
+        Job.objects.filter(pk__in=retry).update(
+            status=Job.QUEUED,
+            attempts=0,
+            run_after=timezone.now(),
+            locked_by='',
+            locked_until=None
+        )
+    modeladmin.message_user(
+        request,
+        f'Поставлено в очередь: {len(retry)}, '
+        f'удалено повторов: {len(duplicates)}.'
+    )
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'task',
+        'status',
+        'priority',
+        'attempts',
+        'run_after',
+        'created_at'
+    )
+    list_filter = ('status', 'task')
+    actions = (retry_jobs,)
+
+
+admin.site.register(Job, JobAdmin)
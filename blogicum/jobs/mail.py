@@ -0,0 +1,46 @@
+"""Почтовый бэкенд, откладывающий отправку писем в очередь заданий."""
+import base64
+from email import message_from_bytes
+
+from django.core.mail import EmailMessage
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .queue import enqueue
+
+
+class StoredEmailMessage(EmailMessage):
+    """Готовое письмо, восстановленное из очереди."""
+
+    def __init__(self, raw, from_email, recipients):
+        super().__init__(from_email=from_email)
+        self.raw = raw
+        self.stored_recipients = recipients
+
+    def message(self):
+        return message_from_bytes(self.raw)
+
+    def recipients(self):
+        return self.stored_recipients
+
+
+class EmailBackend(BaseEmailBackend):
+    """Ставит письма в очередь; отправляет их обработчик run_jobs.
+
+    Письма уходят через бэкенд из настройки JOBS_EMAIL_BACKEND.
+    """
+
+    def send_messages(self, email_messages):
+        from .tasks import send_email
+
+        sent = 0
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            enqueue(
+                send_email,
+                base64.b64encode(message.message().as_bytes()).decode(),
+                message.from_email,
+                message.recipients()
+            )
+            sent += 1
+        return sent
@@ -0,0 +1,128 @@
+"""Обработчик очереди фоновых заданий."""
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import (
+    FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+)
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from jobs import queue
+
+
+def run_in_thread(name, args, kwargs):
+    try:
+        return queue.run(name, args, kwargs)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет задания из очереди в пуле потоков или процессов. '
+        'С --workers 0 задания выполняются по одному в текущем потоке.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument(
+            '--processes',
+            action='store_true',
+            help='Пул процессов вместо пула потоков.'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить доступные задания и завершиться.'
+        )
+        parser.add_argument(
+            '--visibility-timeout',
+            type=int,
+            default=settings.JOBS_VISIBILITY_TIMEOUT,
+            help='Через сколько секунд незавершённое задание вернётся.'
+        )
+
+    def handle(self, *args, **options):
+        self.worker = '{}:{}:{}'.format(
+            socket.gethostname()[:40], os.getpid(), uuid.uuid4().hex[:8]
+        )
+        self.timeout = options['visibility_timeout']
+        self.done = self.failed = 0
+        if options['workers'] < 1:
+            self.run_inline(options['once'])
+        else:
+            self.run_pool(options)
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено заданий: {self.done}, с ошибкой: {self.failed}'
+        ))
+
+    def finish(self, job, error=None):
+        if error is None:
+            queue.complete(job)
+            self.done += 1
+        else:
+            queue.fail(job, error)
+            self.failed += 1
+            self.stderr.write(f'{job}: {error!r}')
+
+    def run_inline(self, once):
+        while True:
+            jobs = queue.claim(self.worker, 1, self.timeout)
+            if not jobs:
+                if once:
+                    return
+                time.sleep(settings.JOBS_POLL_INTERVAL)
+                continue
+            job, = jobs
+            try:
+                queue.run(job.task, job.args, job.kwargs)
+            except Exception as error:
+                self.finish(job, error)
+            else:
+                self.finish(job)
+
+    def make_executor(self, options):
+        if options['processes']:
+            # Дочерние процессы открывают свои соединения с базой.
+            connections.close_all()
+            return ProcessPoolExecutor(
+                max_workers=options['workers'], initializer=django.setup
+            ), queue.run
+        return ThreadPoolExecutor(
+            max_workers=options['workers'], thread_name_prefix='jobs'
+        ), run_in_thread
+
+    def run_pool(self, options):
+        executor, function = self.make_executor(options)
+        running = {}
+        heartbeat = time.monotonic()
+        with executor:
+            while True:
+                close_old_connections()
+                if time.monotonic() - heartbeat > self.timeout / 2:
+                    queue.extend(running.values(), self.timeout)
+                    heartbeat = time.monotonic()
+                free = options['workers'] - len(running)
+                if free > 0:
+                    for job in queue.claim(self.worker, free, self.timeout):
+                        future = executor.submit(
+                            function, job.task, job.args, job.kwargs
+                        )
+                        running[future] = job
+                if not running:
+                    if options['once']:
+                        return
+                    time.sleep(settings.JOBS_POLL_INTERVAL)
+                    continue
+                finished, _ = wait(
+                    running,
+                    timeout=settings.JOBS_POLL_INTERVAL,
+                    return_when=FIRST_COMPLETED
+                )
+                for future in finished:
+                    self.finish(running.pop(future), future.exception())
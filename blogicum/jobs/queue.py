@@ -0,0 +1,150 @@
+"""Очередь фоновых заданий в базе данных проекта.
+
+Задачи регистрируются декоратором task в модулях tasks.py приложений и
+ставятся в очередь функцией enqueue. Обработчик забирает задания
+командой run_jobs: задание занимается на время видимости, и если
+обработчик не успел отчитаться, оно снова становится доступным.
+"""
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+_tasks = {}
+
+
+def task(func):
+    """Регистрирует функцию как задачу, которую можно поставить в очередь."""
+    name = f'{func.__module__}.{func.__name__}'
+    _tasks[name] = func
+    func.task_name = name
+    return func
+
+
+def get_task(name):
+    try:
+        return _tasks[name]
+    except KeyError:
+        raise LookupError(f'Задача {name} не зарегистрирована.')
+
+
+def enqueue(func, *args, priority=0, delay=None, key=None,
+            max_attempts=None, **kwargs):
+    """Ставит задачу в очередь и возвращает задание.
+
+    Аргументы должны сериализоваться в JSON. Если задание с тем же key
+    уже ждёт в очереди, новое не создаётся и возвращается None.
+    Внутри транзакции задание станет видно обработчику после её фиксации.
+    """
+    name = getattr(func, 'task_name', func)
+    get_task(name)
+    job = Job(
+        task=name,
+        args=list(args),
+        kwargs=kwargs,
+        key=key,
+        priority=priority,
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+        run_after=timezone.now() + (delay or timedelta())
+    )
+    if key is None:
+        job.save()
+        return job
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        return None
+    return job
+
+
+def run(name, args, kwargs):
+    """Выполняет задачу; вызывается в потоке или процессе пула."""
+    return get_task(name)(*args, **kwargs)
+
+
+def _available(now):
+    return Job.objects.filter(
+        status=Job.QUEUED, run_after__lte=now
+    ) | Job.objects.filter(
+        status=Job.RUNNING, locked_until__lt=now
+    )
+
+
+def reap(now=None):
+    """Помечает упавшими занятые задания, исчерпавшие попытки."""
+    now = now or timezone.now()
+    return Job.objects.filter(
+        status=Job.RUNNING,
+        locked_until__lt=now,
+        attempts__gte=F('max_attempts')
+    ).update(
+        status=Job.FAILED,
+        locked_until=None,
+        last_error='Истекло время видимости задания.'
+    )
+
+
+def claim(worker, limit, timeout=None):
+    """Занимает до limit доступных заданий за обработчиком worker."""
+    now = timezone.now()
+    timeout = timeout or settings.JOBS_VISIBILITY_TIMEOUT
+    with transaction.atomic():
+        reap(now)
+        ids = list(
+            _available(now).select_for_update(skip_locked=True)
+            .order_by('-priority', 'run_after', 'id')
+            .values_list('pk', flat=True)[:limit]
+        )
+        _available(now).filter(pk__in=ids).update(
+            status=Job.RUNNING,
+            attempts=F('attempts') + 1,
+            locked_by=worker,
+            locked_until=now + timedelta(seconds=timeout)
+        )
+    return list(Job.objects.filter(
+        pk__in=ids, locked_by=worker, status=Job.RUNNING
+    ).order_by('-priority', 'run_after', 'id'))
+
+
+def extend(jobs, timeout=None):
+    """Продлевает время видимости выполняющихся заданий."""
+    timeout = timeout or settings.JOBS_VISIBILITY_TIMEOUT
+    for job in jobs:
+        Job.objects.filter(
+            pk=job.pk, locked_by=job.locked_by, status=Job.RUNNING
+        ).update(locked_until=timezone.now() + timedelta(seconds=timeout))
+
+
+def complete(job):
+    """Удаляет выполненное задание, если оно всё ещё за обработчиком."""
+    Job.objects.filter(
+        pk=job.pk, locked_by=job.locked_by, status=Job.RUNNING
+    ).delete()
+
+
+def fail(job, error):
+    """Возвращает задание в очередь с задержкой или помечает упавшим."""
+    last_error = ''.join(traceback.format_exception(
+        type(error), error, error.__traceback__
+    ))
+    changes = {'locked_until': None, 'last_error': last_error}
+    if job.attempts >= job.max_attempts:
+        changes['status'] = Job.FAILED
+    else:
+        delay = settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1)
+        changes['status'] = Job.QUEUED
+        changes['run_after'] = timezone.now() + timedelta(seconds=delay)
+    try:
+        with transaction.atomic():
+            Job.objects.filter(
+                pk=job.pk, locked_by=job.locked_by, status=Job.RUNNING
+            ).update(**changes)
+    except IntegrityError:
+        # Пока задание выполнялось, в очередь встало такое же.
+        Job.objects.filter(pk=job.pk).delete()
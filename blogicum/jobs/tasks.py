@@ -0,0 +1,17 @@
+"""Задачи приложения jobs."""
+import base64
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+from .mail import StoredEmailMessage
+from .queue import task
+
+
+@task
+def send_email(raw, from_email, recipients):
+    """Отправляет письмо, поставленное в очередь почтовым бэкендом."""
+    message = StoredEmailMessage(
+        base64.b64decode(raw), from_email, recipients
+    )
+    get_connection(settings.JOBS_EMAIL_BACKEND).send_messages([message])
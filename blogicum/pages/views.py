@@ -3,14 +3,16 @@
 from django.shortcuts import render
 from django.views.generic import TemplateView
 
+from blog.mixins import AnonymousPageCacheMixin
 
-class About(TemplateView):
+
+class About(AnonymousPageCacheMixin, TemplateView):
     """CBV статичной страницы about."""
 
     template_name = 'pages/about.html'
 
 
-class Rules(TemplateView):
+class Rules(AnonymousPageCacheMixin, TemplateView):
     """CBV статичной страницы rules."""
 
     template_name = 'pages/rules.html'
@@ -0,0 +1,11 @@
+// Подгружает следующую порцию комментариев вместо перехода по ссылке.
+document.getElementById('comments').addEventListener('click', function (event) {
+  var link = event.target.closest('[data-comments-url]');
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  fetch(link.dataset.commentsUrl)
+    .then(function (response) { return response.text(); })
+    .then(function (html) { link.outerHTML = html; });
+});
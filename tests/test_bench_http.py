@@ -0,0 +1,48 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.management.commands.bench_http import SCENARIOS, summarize
+
+
+def test_summarize():
+    latencies = [index / 1000 for index in range(1, 101)]
+    summary = summarize(latencies, 2.0, {200: 99, "error": 1})
+    assert summary["rps"] == 50.0
+    assert summary["p50_ms"] == pytest.approx(50.5)
+    assert summary["p99_ms"] == pytest.approx(99.01)
+    assert summary["statuses"] == {"200": 99, "error": 1}
+
+
+@pytest.mark.django_db
+def test_bench_http_in_process(tmp_path):
+    call_command(
+        "generate_data",
+        users=5,
+        categories=2,
+        locations=2,
+        posts=30,
+        comments=100,
+        images=0,
+        workers=1,
+        unpublished_fraction=0,
+        stdout=StringIO(),
+    )
+    output = tmp_path / "bench.json"
+    call_command(
+        "bench_http",
+        requests=3,
+        warmup=1,
+        output=str(output),
+        stderr=StringIO(),
+    )
+    report = json.loads(output.read_text())
+    assert report["dataset"]["posts"] == 30
+    assert set(report["scenarios"]) == set(SCENARIOS)
+    for name, result in report["scenarios"].items():
+        expected = "302" if name == "comment_post" else "200"
+        assert result["statuses"] == {expected: 3}, name
+        assert result["queries"] >= result["cached_queries"]
+    assert report["scenarios"]["post_detail"]["queries"] > 0
@@ -0,0 +1,20 @@
+from django.core.checks import run_checks
+from django.test import override_settings
+
+
+def check_ids():
+    return [message.id for message in run_checks()]
+
+
+def test_shared_cache_passes_check():
+    assert "blog.W001" not in check_ids()
+
+
+def test_process_local_cache_is_reported():
+    local = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+    with override_settings(CACHES=local):
+        assert "blog.W001" in check_ids()
@@ -0,0 +1,75 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+
+def comment_count(post):
+    return Post.objects.values_list("comment_count", flat=True).get(
+        pk=post.pk
+    )
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_comments(
+        user, user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.post(f"/posts/{post.pk}/comment/", {"text": "Первый"})
+    Comment.objects.create(post=post, author=user, text="Второй")
+    assert comment_count(post) == 2
+    comment = Comment.objects.filter(post=post).first()
+    user_client.post(f"/posts/{post.pk}/delete_comment/{comment.pk}/")
+    assert comment_count(post) == 1
+    Comment.objects.filter(post=post).get().delete()
+    assert comment_count(post) == 0
+
+
+@pytest.mark.django_db
+def test_rebuild_comment_counts_fixes_drift(
+        mixer, user, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post, author=user)
+    empty = mixer.blend("blog.Post", author=user)
+    Post.objects.filter(pk=post.pk).update(comment_count=7)
+    Post.objects.filter(pk=empty.pk).update(comment_count=2)
+    stdout = StringIO()
+    call_command("rebuild_comment_counts", batch_size=1, stdout=stdout)
+    assert comment_count(post) == 3
+    assert comment_count(empty) == 0
+    assert "Обновлено постов: 2" in stdout.getvalue()
+
+
+def delete_queries(mixer, user, post, comments):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    mixer.cycle(comments).blend("blog.Comment", post=post, author=user)
+    with CaptureQueriesContext(connection) as queries:
+        post.delete()
+    return len(queries)
+
+
+@pytest.mark.django_db
+def test_post_delete_does_not_scale_with_comments(mixer, user):
+    few, many = (
+        delete_queries(mixer, user, mixer.blend("blog.Post", author=user), n)
+        for n in (2, 60)
+    )
+    assert many == few, (
+        "Удаление поста не должно выполнять запросы на каждый комментарий."
+    )
+
+
+@pytest.mark.django_db
+def test_user_delete_subtracts_comments(mixer, user):
+    other = mixer.blend("blog.Post", author=user)
+    own = mixer.blend("auth.User")
+    commenter = mixer.blend("auth.User")
+    mixer.blend("blog.Post", author=commenter)
+    mixer.cycle(3).blend("blog.Comment", post=other, author=commenter)
+    mixer.blend("blog.Comment", post=other, author=own)
+    assert comment_count(other) == 4
+    commenter.delete()
+    assert comment_count(other) == 1
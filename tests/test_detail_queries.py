@@ -0,0 +1,43 @@
+from http import HTTPStatus
+
+import pytest
+
+from blog import scheduling
+
+
+@pytest.fixture(autouse=True)
+def publication_state(db):
+    scheduling.get_cutoff()
+
+
+@pytest.mark.django_db
+def test_anonymous_detail_queries(
+        client, mixer, post_with_published_location,
+        django_assert_num_queries):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    # Пост со связанными объектами и страница комментариев с авторами.
+    with django_assert_num_queries(2):
+        response = client.get(f"/posts/{post.id}/")
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.context["comments"]) == 3
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("is_published", [True, False])
+def test_author_detail_queries(
+        user_client, another_user_client, post_with_published_location,
+        django_assert_num_queries, is_published):
+    post = post_with_published_location
+    post.is_published = is_published
+    post.save()
+    # Сессия и пользователь, затем те же два запроса: видимость поста
+    # для автора проверяется в запросе самого поста.
+    with django_assert_num_queries(4):
+        response = user_client.get(f"/posts/{post.id}/")
+    assert response.status_code == HTTPStatus.OK
+    assert response.context["post"] == post
+    expected = HTTPStatus.OK if is_published else HTTPStatus.NOT_FOUND
+    assert another_user_client.get(f"/posts/{post.id}/").status_code == (
+        expected
+    )
@@ -0,0 +1,41 @@
+from importlib import import_module
+
+import pytest
+from django.apps import apps
+
+from blog.models import Post
+from blog.query_utils import get_posts
+
+TEXT = " ".join(f"слово{index}" for index in range(30))
+
+
+@pytest.mark.django_db
+def test_save_fills_excerpt(post_with_published_location):
+    post = post_with_published_location
+    post.text = TEXT
+    post.save(update_fields=["text"])
+    post.refresh_from_db()
+    assert post.excerpt == Post.make_excerpt(TEXT)
+    assert post.excerpt.endswith(" …")
+
+
+@pytest.mark.django_db
+def test_deferred_text_keeps_excerpt(post_with_published_location):
+    post = post_with_published_location
+    excerpt = post.excerpt
+    deferred = get_posts(defer_flag=True).get(pk=post.pk)
+    assert "text" in deferred.get_deferred_fields()
+    assert deferred.excerpt == excerpt
+    deferred.title = "Новый заголовок"
+    deferred.save()
+    assert Post.objects.get(pk=post.pk).excerpt == excerpt
+
+
+@pytest.mark.django_db
+def test_migration_backfills_excerpt(mixer, user):
+    posts = mixer.cycle(3).blend("blog.Post", author=user, text=TEXT)
+    Post.objects.update(excerpt="")
+    migration = import_module("blog.migrations.0022_post_excerpt")
+    migration.fill_excerpt(apps, None)
+    for post in posts:
+        assert Post.objects.get(pk=post.pk).excerpt == Post.make_excerpt(TEXT)
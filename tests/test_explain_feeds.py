@@ -0,0 +1,27 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+def test_feed_queries_use_feed_indexes(
+        user, published_category, many_posts_with_published_locations):
+    stdout = StringIO()
+    call_command(
+        "explain_feeds",
+        category=published_category.slug,
+        username=user.username,
+        stdout=stdout,
+    )
+    feed, category, profile, own_profile = (
+        section for section in stdout.getvalue().split("\n\n")
+        if section.strip()
+    )
+    assert "USING INDEX post_feed_idx" in feed
+    assert "USING INDEX post_category_feed_idx" in category
+    # Для профиля планировщик выбирает любой из индексов по автору.
+    assert "USING INDEX post_author_" in profile
+    assert "USING INDEX post_author_" in own_profile
+    assert "TEMP B-TREE" not in stdout.getvalue()
+    assert "сканирование" not in stdout.getvalue()
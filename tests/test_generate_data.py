@@ -0,0 +1,101 @@
+import random
+from datetime import datetime, timezone
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count
+
+from blog import search
+from blog.management.commands.generate_data import (
+    generate_comments, generate_posts, heavy_tailed_counts
+)
+from blog.models import Category, Comment, Post, User
+
+
+def test_heavy_tailed_counts():
+    counts = heavy_tailed_counts(10000, 500, random.Random(1))
+    assert sum(counts) == 10000
+    assert max(counts) > 20 * sorted(counts)[len(counts) // 2]
+    assert counts == heavy_tailed_counts(10000, 500, random.Random(1))
+
+
+def test_generated_rows_are_deterministic():
+    spec = {
+        "users": 10,
+        "author_weights": list(range(1, 11)),
+        "categories": 3,
+        "category_weights": [1, 2, 3],
+        "locations": 2,
+        "future": 0.1,
+        "unpublished": 0.1,
+        "with_image": 0.5,
+        "images": ["post_image/a.jpg"],
+        "now": datetime(2024, 1, 1, tzinfo=timezone.utc),
+    }
+    assert generate_posts(3, 0, 50, spec) == generate_posts(3, 0, 50, spec)
+    assert generate_posts(3, 0, 50, spec) != generate_posts(4, 0, 50, spec)
+    comments = generate_comments(3, 0, [(0, 5), (2, 7)], spec)
+    assert [post for post, _, _ in comments] == [0] * 5 + [2] * 7
+    assert comments == generate_comments(3, 0, [(0, 5), (2, 7)], spec)
+
+
+def generate(**options):
+    call_command(
+        "generate_data",
+        **{
+            "users": 20,
+            "categories": 3,
+            "locations": 4,
+            "posts": 60,
+            "comments": 500,
+            "images": 1,
+            "workers": 1,
+            "seed": 7,
+            "stdout": StringIO(),
+            **options,
+        }
+    )
+
+
+@pytest.mark.django_db
+def test_generate_data():
+    generate()
+    assert User.objects.filter(username__startswith="gen7_").count() == 20
+    assert Category.objects.filter(slug__startswith="gen7-").count() == 3
+    assert Post.objects.count() == 60
+    assert Comment.objects.count() == 500
+    actual = dict(
+        Post.objects.annotate(n=Count("comments")).values_list("pk", "n")
+    )
+    assert actual == dict(Post.objects.values_list("pk", "comment_count"))
+    post = Post.objects.exclude(image="").first()
+    assert post.image_renditions["source"] == post.image.name
+    assert post.excerpt == Post.make_excerpt(post.text)
+    word = post.title.split()[0]
+    assert search.search_posts(Post.objects.all(), word).exists()
+
+
+@pytest.mark.django_db
+def test_rerun_with_same_seed_reuses_users():
+    generate()
+    generate(users=25, posts=10, comments=50)
+    assert User.objects.filter(username__startswith="gen7_").count() == 25
+    assert Category.objects.filter(slug__startswith="gen7-").count() == 3
+    assert Post.objects.count() == 70
+
+
+@pytest.mark.django_db
+def test_conflicting_rows_raise_command_error(monkeypatch):
+    from blog.management.commands import generate_data
+
+    monkeypatch.setattr(
+        generate_data.Command, "insert_missing",
+        lambda self, model, field, prefix, objects: self.insert(
+            model, objects
+        )
+    )
+    generate(posts=1, comments=0)
+    with pytest.raises(CommandError, match="--prefix"):
+        generate(posts=1, comments=0)
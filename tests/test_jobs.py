@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from jobs import queue
+from jobs.models import Job
+
+calls = []
+
+
+@queue.task
+def record(value):
+    calls.append(value)
+
+
+@queue.task
+def explode():
+    raise ValueError("boom")
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+
+
+@pytest.mark.django_db
+def test_priority_order_and_dedupe():
+    queue.enqueue(record, "low")
+    queue.enqueue(record, "high", priority=5)
+    assert queue.enqueue(record, "again", key="k") is not None
+    assert queue.enqueue(record, "duplicate", key="k") is None
+    queue.enqueue(record, "later", delay=timedelta(hours=1))
+    call_command("run_jobs", workers=0, once=True)
+    assert calls == ["high", "low", "again"]
+    assert list(Job.objects.values_list("args", flat=True)) == [["later"]]
+
+
+@pytest.mark.django_db
+@override_settings(JOBS_RETRY_DELAY=0)
+def test_retries_then_fails():
+    queue.enqueue(explode, max_attempts=2)
+    call_command("run_jobs", workers=0, once=True)
+    job = Job.objects.get()
+    assert job.status == Job.FAILED
+    assert job.attempts == 2
+    assert "boom" in job.last_error
+
+
+@pytest.mark.django_db
+def test_expired_job_is_claimed_again():
+    queue.enqueue(record, "slow")
+    first, = queue.claim("dead-worker", 10, timeout=60)
+    assert queue.claim("other", 10) == []
+    Job.objects.filter(pk=first.pk).update(
+        locked_until=timezone.now() - timedelta(seconds=1)
+    )
+    second, = queue.claim("other", 10)
+    assert second.pk == first.pk and second.attempts == 2
+    queue.complete(first)
+    assert Job.objects.filter(pk=first.pk).exists()
+    queue.complete(second)
+    assert not Job.objects.exists()
+
+
+@pytest.mark.django_db
+@override_settings(
+    JOBS_EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend"
+)
+def test_queued_email_is_sent_by_worker():
+    mail.get_connection("jobs.mail.EmailBackend").send_messages([
+        mail.EmailMessage(
+            "Тема", "Текст", "from@example.com", ["to@example.com"]
+        )
+    ])
+    assert mail.outbox == []
+    call_command("run_jobs", workers=0, once=True)
+    message, = mail.outbox
+    assert message.recipients() == ["to@example.com"]
+    assert message.message().get_payload(decode=True).decode() == "Текст"
+
+
+@pytest.mark.django_db
+def test_admin_retry_skips_queued_keys(admin_client):
+    queued = queue.enqueue(record, "queued", key="renditions:1")
+    failed = [
+        Job.objects.create(
+            task=record.task_name, args=[value], key=key, status=Job.FAILED
+        )
+        for value, key in (
+            ("same-key", "renditions:1"),
+            ("other", "renditions:2"),
+            ("other-again", "renditions:2"),
+            ("no-key", None),
+        )
+    ]
+    response = admin_client.post("/admin/jobs/job/", {
+        "action": "retry_jobs",
+        "_selected_action": [job.pk for job in failed],
+    })
+    assert response.status_code == 302
+    assert not Job.objects.filter(status=Job.FAILED).exists()
+    assert dict(Job.objects.values_list("key", "args")) == {
+        "renditions:1": ["queued"],
+        "renditions:2": ["other-again"],
+        None: ["no-key"],
+    }
+    assert Job.objects.filter(pk=queued.pk, status=Job.QUEUED).exists()
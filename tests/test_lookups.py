@@ -0,0 +1,71 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.http import Http404, HttpRequest
+
+from blog import lookups
+
+
+@pytest.mark.django_db
+def test_lookup_is_memoized_per_request(
+        published_category, django_assert_num_queries):
+    request = HttpRequest()
+    with django_assert_num_queries(1):
+        first = lookups.get_category(request, published_category.slug)
+        cache.clear()
+        second = lookups.get_category(request, published_category.slug)
+    assert first is second
+
+
+@pytest.mark.django_db
+def test_lookup_is_cached_across_requests(
+        user, published_category, django_assert_num_queries):
+    lookups.get_category(HttpRequest(), published_category.slug)
+    lookups.get_profile(HttpRequest(), user.username)
+    with django_assert_num_queries(0):
+        category = lookups.get_category(
+            HttpRequest(), published_category.slug
+        )
+        profile = lookups.get_profile(HttpRequest(), user.username)
+    assert category == published_category
+    assert profile == user
+
+
+@pytest.mark.django_db
+def test_category_slug_change_forgets_lookup(
+        client, published_category, django_capture_on_commit_callbacks):
+    old_slug = published_category.slug
+    assert client.get(f"/category/{old_slug}/").status_code == HTTPStatus.OK
+    published_category.slug = "renamed"
+    with django_capture_on_commit_callbacks(execute=True):
+        published_category.save()
+    with pytest.raises(Http404):
+        lookups.get_category(HttpRequest(), old_slug)
+    assert lookups.get_category(HttpRequest(), "renamed").slug == "renamed"
+    assert client.get(f"/category/{old_slug}/").status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+    published_category.is_published = False
+    with django_capture_on_commit_callbacks(execute=True):
+        published_category.save()
+    with pytest.raises(Http404):
+        lookups.get_category(HttpRequest(), "renamed")
+
+
+@pytest.mark.django_db
+def test_username_change_forgets_lookup(
+        client, user, django_capture_on_commit_callbacks):
+    old_username = user.username
+    assert client.get(f"/profile/{old_username}/").status_code == (
+        HTTPStatus.OK
+    )
+    user.username = "renamed"
+    with django_capture_on_commit_callbacks(execute=True):
+        user.save()
+    with pytest.raises(Http404):
+        lookups.get_profile(HttpRequest(), old_username)
+    assert lookups.get_profile(HttpRequest(), "renamed").pk == user.pk
+    assert client.get(f"/profile/{old_username}/").status_code == (
+        HTTPStatus.NOT_FOUND
+    )
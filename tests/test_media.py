@@ -0,0 +1,104 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def media_root(tmp_path):
+    (tmp_path / "post_image").mkdir()
+    (tmp_path / "post_image" / "photo.jpg").write_bytes(CONTENT)
+    (tmp_path / "post_image" / "photo-320.0123456789ab.webp").write_bytes(
+        CONTENT
+    )
+    with override_settings(MEDIA_ROOT=tmp_path):
+        yield tmp_path
+
+
+def body(response):
+    return b"".join(response.streaming_content)
+
+
+def test_full_response_headers(client, media_root):
+    response = client.get("/media/post_image/photo.jpg")
+    assert response.status_code == HTTPStatus.OK
+    assert body(response) == CONTENT
+    assert response["Content-Type"] == "image/jpeg"
+    assert response["Accept-Ranges"] == "bytes"
+    assert response["ETag"].startswith('"')
+    assert "Last-Modified" in response
+    assert "immutable" not in response["Cache-Control"]
+
+    hashed = client.get("/media/post_image/photo-320.0123456789ab.webp")
+    assert hashed["Cache-Control"] == "public, max-age=31536000, immutable"
+
+
+def test_conditional_requests(client, media_root):
+    response = client.get("/media/post_image/photo.jpg")
+    not_modified = client.get(
+        "/media/post_image/photo.jpg", HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    assert not_modified.content == b""
+    since = client.get(
+        "/media/post_image/photo.jpg",
+        HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+    )
+    assert since.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.parametrize(
+    ("header", "content_range", "expected"),
+    [
+        ("bytes=0-9", "bytes 0-9/1024", CONTENT[:10]),
+        ("bytes=1000-", "bytes 1000-1023/1024", CONTENT[1000:]),
+        ("bytes=-24", "bytes 1000-1023/1024", CONTENT[-24:]),
+        ("bytes=1000-5000", "bytes 1000-1023/1024", CONTENT[1000:]),
+    ],
+)
+def test_byte_ranges(client, media_root, header, content_range, expected):
+    response = client.get("/media/post_image/photo.jpg", HTTP_RANGE=header)
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT
+    assert response["Content-Range"] == content_range
+    assert int(response["Content-Length"]) == len(expected)
+    assert body(response) == expected
+
+
+def test_unsatisfiable_and_stale_ranges(client, media_root):
+    response = client.get(
+        "/media/post_image/photo.jpg", HTTP_RANGE="bytes=2000-"
+    )
+    assert response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+    assert response["Content-Range"] == "bytes */1024"
+    stale = client.get(
+        "/media/post_image/photo.jpg",
+        HTTP_RANGE="bytes=0-9",
+        HTTP_IF_RANGE='"stale"',
+    )
+    assert stale.status_code == HTTPStatus.OK
+    assert body(stale) == CONTENT
+
+
+def test_missing_and_traversal(client, media_root):
+    assert client.get("/media/nope.jpg").status_code == HTTPStatus.NOT_FOUND
+    assert client.get(
+        "/media/post_image/../../etc/passwd"
+    ).status_code == HTTPStatus.NOT_FOUND
+    assert client.get("/media/post_image/").status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+
+
+def test_proxy_offload(client, media_root):
+    with override_settings(MEDIA_SENDFILE="x-accel-redirect"):
+        response = client.get("/media/post_image/photo.jpg")
+    assert response["X-Accel-Redirect"] == (
+        "/protected-media/post_image/photo.jpg"
+    )
+    assert response.content == b""
+    assert response["Content-Type"] == "image/jpeg"
+    with override_settings(MEDIA_SENDFILE="x-sendfile"):
+        response = client.get("/media/post_image/photo.jpg")
+    assert response["X-Sendfile"] == str(media_root / "post_image/photo.jpg")
@@ -0,0 +1,62 @@
+import logging
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+
+from blog import metrics
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+@pytest.mark.django_db
+def test_views_are_measured(client, post_with_published_location):
+    client.get("/")
+    client.get("/")
+    client.get(f"/posts/{post_with_published_location.id}/")
+    totals = metrics.snapshot()
+    index = totals["blog:index"]
+    assert index["requests"] == 2
+    assert index["max_queries"] > 0
+    assert index["render_time"] > 0
+    assert index["avg_bytes"] > 0
+    assert totals["blog:post_detail"]["queries"] > 0
+
+
+@pytest.mark.django_db
+def test_budget_overrun_is_logged(client, caplog):
+    with override_settings(QUERY_BUDGETS={"blog:index": 0}):
+        with caplog.at_level(logging.WARNING, logger="blog.metrics"):
+            client.get("/")
+    assert metrics.snapshot()["blog:index"]["over_budget"] == 1
+    assert "blog:index" in caplog.text
+
+
+@pytest.mark.django_db
+def test_stats_endpoint_is_staff_only(client, user_client, admin_client):
+    client.get("/")
+    assert client.get("/stats/queries/").status_code == HTTPStatus.FOUND
+    assert user_client.get("/stats/queries/").status_code == (
+        HTTPStatus.FOUND
+    )
+    response = admin_client.get("/stats/queries/")
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["blog:index"]["requests"] == 1
+
+
+@pytest.mark.django_db
+def test_totals_are_logged_at_info(client, caplog):
+    logger = logging.getLogger("blog.metrics")
+    assert logger.isEnabledFor(logging.INFO)
+    assert logger.handlers
+    with override_settings(QUERY_METRICS_LOG_INTERVAL=0):
+        client.get("/")
+    assert any(
+        record.levelno == logging.INFO and "blog:index" in record.getMessage()
+        for record in caplog.records
+    )
@@ -0,0 +1,157 @@
+import pytest
+from django.core.cache import cache
+
+from blog import page_cache
+from blog.models import Post
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    page_cache.reset_stats()
+    yield
+    page_cache.reset_stats()
+
+
+@pytest.mark.django_db
+def test_anonymous_pages_are_cached(client, post_with_published_location):
+    post = post_with_published_location
+    urls = [
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+        f"/posts/{post.id}/",
+    ]
+    for url in urls:
+        assert client.get(url).context is not None
+        assert client.get(url).context is None, (
+            f"Повторный запрос {url} должен отдаваться из кэша."
+        )
+    stats = page_cache.get_stats()
+    assert stats == {"hits": len(urls), "misses": len(urls)}
+
+
+@pytest.mark.django_db
+def test_writes_invalidate_cached_pages(
+        client, mixer, post_with_published_location,
+        django_capture_on_commit_callbacks):
+    post = post_with_published_location
+    urls = [
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+        f"/posts/{post.id}/",
+    ]
+    for url in urls:
+        client.get(url)
+    with django_capture_on_commit_callbacks(execute=True):
+        mixer.blend("blog.Comment", post=post, text="Свежий комментарий")
+    for url in urls:
+        assert client.get(url).context is not None, (
+            f"Страница {url} должна обновиться после нового комментария."
+        )
+    post.location.name = "Новое место"
+    with django_capture_on_commit_callbacks(execute=True):
+        post.location.save()
+    assert "Новое место" in client.get("/").content.decode()
+
+
+@pytest.mark.django_db
+def test_invalidation_waits_for_commit(
+        client, mixer, post_with_published_location,
+        django_capture_on_commit_callbacks):
+    post = post_with_published_location
+    client.get("/")
+    with django_capture_on_commit_callbacks() as callbacks:
+        mixer.blend("blog.Comment", post=post, text="Свежий комментарий")
+        assert client.get("/").context is None, (
+            "До фиксации транзакции кэш страниц сбрасываться не должен."
+        )
+    assert callbacks
+    for callback in callbacks:
+        callback()
+    assert client.get("/").context is not None
+
+
+def test_invalidate_replaces_generations():
+    first = page_cache.get_generations([page_cache.FEED, page_cache.SITE])
+    page_cache.invalidate(page_cache.FEED)
+    second = page_cache.get_generations([page_cache.FEED, page_cache.SITE])
+    assert second[0] != first[0]
+    assert second[1] == first[1]
+
+
+@pytest.mark.django_db
+def test_logged_in_users_bypass_cache(user_client, post_with_published_location):
+    user_client.get("/")
+    assert user_client.get("/").context is not None
+    assert page_cache.get_stats() == {"hits": 0, "misses": 0}
+
+
+@pytest.mark.django_db
+def test_card_fragment_follows_related_changes(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.get("/")
+    post.category.title = "Переименованная категория"
+    post.category.save()
+    post.author.username = "renamed_author"
+    post.author.save()
+    content = user_client.get("/").content.decode()
+    assert "Переименованная категория" in content
+    assert "@renamed_author" in content
+
+
+def updated_at(post):
+    return Post.objects.values_list("updated_at", flat=True).get(pk=post.pk)
+
+
+@pytest.mark.django_db
+def test_only_card_fields_touch_posts(post_with_published_location):
+    post = post_with_published_location
+    stamp = updated_at(post)
+    post.category.description = "Другое описание"
+    post.category.save()
+    post.location.save()
+    assert updated_at(post) == stamp
+    post.category.title = "Новое название"
+    post.category.save()
+    assert updated_at(post) > stamp
+    stamp = updated_at(post)
+    post.location.is_published = False
+    post.location.save(update_fields=["is_published"])
+    assert updated_at(post) > stamp
+
+
+@pytest.mark.django_db
+def test_card_fragment_timeout_from_settings(
+        user_client, post_with_published_location, settings):
+    post = post_with_published_location
+    settings.POST_CARD_CACHE_TIMEOUT = 0
+    user_client.get("/")
+    Post.objects.filter(pk=post.pk).update(title="Заголовок без кэша")
+    assert "Заголовок без кэша" in user_client.get("/").content.decode()
+
+
+@pytest.mark.django_db
+def test_warm_pages_fills_cache(client, post_with_published_location):
+    from blog.tasks import warm_pages
+
+    post = post_with_published_location
+    paths = ["/", "/?page=1", f"/category/{post.category.slug}/"]
+    warm_pages(*paths)
+    for path in paths:
+        assert client.get(path).context is None, (
+            f"Страница {path} должна отдаваться из прогретого кэша."
+        )
+
+
+def test_hits_are_counted_in_process(settings):
+    settings.PAGE_CACHE_STATS_INTERVAL = 3600
+    page_cache.record(True)
+    page_cache.record(False)
+    assert cache.get(page_cache.STATS_KEYS[True]) is None
+    assert page_cache.get_stats() == {"hits": 1, "misses": 1}
+    settings.PAGE_CACHE_STATS_INTERVAL = 0
+    page_cache.record(True)
+    assert cache.get(page_cache.STATS_KEYS[True]) == 2
+    assert page_cache.get_stats() == {"hits": 2, "misses": 1}
@@ -0,0 +1,175 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.pagination import encode_cursor
+from conftest import N_PER_PAGE
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category):
+    now = timezone.now()
+    same_date = now - timedelta(days=3)
+    dates = [same_date] * 5 + [
+        now - timedelta(days=i, hours=1) for i in range(4, 4 + N_PER_PAGE * 2)
+    ]
+    return mixer.cycle(len(dates)).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=mixer.sequence(*dates),
+    )
+
+
+@pytest.mark.django_db
+def test_cursor_walk_matches_page_order(user_client, feed_posts):
+    expected = [post.id for post in sorted(
+        feed_posts, key=lambda post: (post.pub_date, post.id), reverse=True
+    )]
+    seen = []
+    cursors = []
+    response = user_client.get("/?cursor=")
+    while True:
+        assert response.status_code == HTTPStatus.OK
+        page = response.context["page_obj"]
+        seen.extend(post.id for post in page)
+        if not page.next_cursor:
+            break
+        cursors.append(page.next_cursor)
+        response = user_client.get(f"/?cursor={page.next_cursor}")
+    assert seen == expected
+
+    previous = user_client.get(f"/?cursor={cursors[-1]}").context["page_obj"]
+    back = user_client.get(f"/?cursor={previous.previous_cursor}")
+    assert [post.id for post in back.context["page_obj"]] == (
+        expected[N_PER_PAGE:N_PER_PAGE * 2]
+    )
+
+
+@pytest.mark.django_db
+def test_deep_page_numbers_switch_to_cursor(client, feed_posts):
+    with override_settings(MAX_PAGE_NUMBER=1):
+        response = client.get("/")
+        page = response.context["page_obj"]
+        assert page.next_cursor
+        assert f"?cursor={page.next_cursor}" in response.content.decode()
+        assert client.get("/?page=2").status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_invalid_cursor_returns_404(client, feed_posts):
+    assert client.get("/?cursor=broken").status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "values", [["x", 1], [[1], 1], [None, 1], ["2024-01-01T00:00:00", "y"]]
+)
+def test_tampered_cursor_returns_404(client, feed_posts, values):
+    cursor = encode_cursor(values)
+    assert client.get(f"/?cursor={cursor}").status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+    post = feed_posts[0]
+    response = client.get(f"/posts/{post.id}/comments/?cursor={cursor}")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    response = client.get(f"/search/?q=post&cursor={encode_cursor([[1], 1])}")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_comments_load_in_batches(client, mixer, post_with_published_location):
+    post = post_with_published_location
+    with override_settings(NUMBER_OF_COMMENTS=3):
+        mixer.cycle(5).blend("blog.Comment", post=post)
+        response = client.get(f"/posts/{post.id}/")
+        comments = response.context["comments"]
+        assert len(comments) == 3
+        assert comments.next_cursor
+        fragment = client.get(
+            f"/posts/{post.id}/comments/?cursor={comments.next_cursor}"
+        )
+        assert fragment.status_code == HTTPStatus.OK
+        rest = fragment.context["comments"]
+        assert len(rest) == 2
+        assert not rest.next_cursor
+        assert "<html" not in fragment.content.decode()
+
+
+@pytest.mark.django_db
+def test_comments_fallback_links_both_ways(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    with override_settings(NUMBER_OF_COMMENTS=3):
+        first = mixer.cycle(5).blend("blog.Comment", post=post)[:3]
+        response = client.get(f"/posts/{post.id}/")
+        content = response.content.decode()
+        assert "?comments=" in content
+        assert "js/comments.js" in content
+        assert "addEventListener" not in content
+        next_cursor = response.context["comments"].next_cursor
+        response = client.get(f"/posts/{post.id}/?comments={next_cursor}")
+        previous_cursor = response.context["comments"].previous_cursor
+        assert f"?comments={previous_cursor}#comments" in (
+            response.content.decode()
+        )
+        response = client.get(
+            f"/posts/{post.id}/?comments={previous_cursor}"
+        )
+        comments = response.context["comments"]
+        assert [comment.id for comment in comments] == [
+            comment.id for comment in first
+        ]
+        assert not comments.previous_cursor
+
+
+@pytest.mark.django_db
+def test_page_count_is_cached_and_window_elided(
+        user_client, feed_posts, django_capture_on_commit_callbacks):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with override_settings(MAX_PAGE_NUMBER=50):
+        user_client.get("/")
+        with CaptureQueriesContext(connection) as queries:
+            response = user_client.get("/?page=2")
+        assert not any(
+            "COUNT(" in query["sql"] for query in queries.captured_queries
+        )
+        page = response.context["page_obj"]
+        assert page.elided_page_range == [1, 2, 3]
+
+        post = feed_posts[0]
+        post.pk = None
+        with django_capture_on_commit_callbacks(execute=True):
+            post.save()
+        with CaptureQueriesContext(connection) as queries:
+            user_client.get("/")
+        assert any(
+            "COUNT(" in query["sql"] for query in queries.captured_queries
+        )
+
+
+@pytest.mark.django_db
+def test_page_count_follows_category_changes(
+        user_client, user, feed_posts, published_category,
+        django_capture_on_commit_callbacks):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    urls = ["/", f"/profile/{user.username}/"]
+    for url in urls:
+        user_client.get(url)
+    published_category.is_published = False
+    with django_capture_on_commit_callbacks(execute=True):
+        published_category.save()
+    for url in urls:
+        with CaptureQueriesContext(connection) as queries:
+            user_client.get(url)
+        assert any(
+            "COUNT(" in query["sql"] for query in queries.captured_queries
+        ), f"Количество постов на {url} должно пересчитаться."
@@ -0,0 +1,215 @@
+"""Верхние границы количества SQL-запросов для каждого адреса.
+
+Данных больше, чем помещается на страницу ленты и в порцию комментариев,
+поэтому N+1 по постам, авторам или комментариям выходит за границу.
+Запись проверяется валидными формами с фото и местоположением — самым
+дорогим вариантом.
+"""
+from datetime import timedelta
+from io import BytesIO
+
+import pytest
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+
+N_POSTS = settings.NUMBER_OF_POSTS * 3
+N_COMMENTS = settings.NUMBER_OF_COMMENTS + 10
+N_COMMENTERS = 5
+
+ROLES = ("anonymous", "non_author", "author")
+
+# Адрес, метод, имя представления для бюджета из QUERY_BUDGETS.
+URLS = (
+    ("/", "get", "blog:index"),
+    ("/?page=2", "get", "blog:index"),
+    ("/?cursor=", "get", "blog:index"),
+    ("/search/?q=пост", "get", "blog:search"),
+    ("/stats/queries/", "get", "blog:query_stats"),
+    ("/category/{category}/", "get", "blog:category_posts"),
+    ("/profile/{author}/", "get", "blog:profile"),
+    ("/profile/edit/", "get", "blog:edit_profile"),
+    ("/profile/edit/", "post", "blog:edit_profile"),
+    ("/posts/{post}/", "get", "blog:post_detail"),
+    ("/posts/{post}/comments/", "get", "blog:comments"),
+    ("/posts/create/", "get", "blog:create_post"),
+    ("/posts/create/", "post", "blog:create_post"),
+    ("/posts/{post}/edit/", "get", "blog:edit_post"),
+    ("/posts/{post}/edit/", "post", "blog:edit_post"),
+    ("/posts/{post}/delete/", "get", "blog:delete_post"),
+    ("/posts/{post}/delete/", "post", "blog:delete_post"),
+    ("/posts/{post}/comment/", "post", "blog:add_comment"),
+    ("/posts/{post}/edit_comment/{comment}/", "get", "blog:edit_comment"),
+    ("/posts/{post}/edit_comment/{comment}/", "post", "blog:edit_comment"),
+    (
+        "/posts/{post}/delete_comment/{comment}/",
+        "get",
+        "blog:delete_comment"
+    ),
+    (
+        "/posts/{post}/delete_comment/{comment}/",
+        "post",
+        "blog:delete_comment"
+    ),
+    ("/pages/about/", "get", "pages:about"),
+    ("/pages/rules/", "get", "pages:rules"),
+)
+
+
+@pytest.fixture
+def seeded(mixer, user, published_category, published_location):
+    now = timezone.now()
+    posts = mixer.cycle(N_POSTS).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+        is_published=True,
+        pub_date=mixer.sequence(
+            *(now - timedelta(hours=i) for i in range(1, N_POSTS + 1))
+        ),
+        title="Пост",
+        text="Текст поста",
+        image="",
+    )
+    commenters = mixer.cycle(N_COMMENTERS).blend(
+        "auth.User", username=mixer.sequence("commenter{0}")
+    )
+    post = posts[0]
+    comments = mixer.cycle(N_COMMENTS).blend(
+        "blog.Comment",
+        post=post,
+        author=mixer.sequence(
+            *(commenters[i % N_COMMENTERS] for i in range(N_COMMENTS))
+        ),
+        text="Комментарий",
+    )
+    own_comment = mixer.blend(
+        "blog.Comment", post=post, author=user, text="Свой комментарий"
+    )
+    return {
+        "post": post.id,
+        "author": user.username,
+        "category": published_category.slug,
+        "comment": own_comment.id,
+        "comments": comments,
+    }
+
+
+def make_image():
+    img_io = BytesIO()
+    Image.new("RGB", (50, 50)).save(img_io, format="JPEG")
+    return SimpleUploadedFile("post.jpg", img_io.getvalue(), "image/jpeg")
+
+
+@pytest.fixture
+def form_data(published_category, published_location):
+    def build(view_name):
+        if view_name in ("blog:create_post", "blog:edit_post"):
+            return {
+                "title": "Новый заголовок",
+                "text": "Новый текст",
+                "pub_date": "2020-01-01 10:00",
+                "category": published_category.id,
+                "location": published_location.id,
+                "image": make_image(),
+            }
+        if view_name == "blog:edit_profile":
+            return {
+                "username": "renamed",
+                "first_name": "Имя",
+                "last_name": "Фамилия",
+                "email": "renamed@example.com",
+            }
+        return {"text": "Новый текст"}
+    return build
+
+
+@pytest.fixture
+def role_client(request, client, user_client, another_user_client):
+    return {
+        "anonymous": client,
+        "non_author": another_user_client,
+        "author": user_client,
+    }[request.param]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("role_client", ROLES, indirect=True)
+@pytest.mark.parametrize(("url", "method", "view_name"), URLS)
+def test_query_count_is_bounded(
+        seeded, role_client, url, method, view_name, form_data,
+        django_assert_max_num_queries):
+    url = url.format(**seeded)
+    data = form_data(view_name) if method == "post" else None
+    with django_assert_max_num_queries(settings.QUERY_BUDGETS[view_name]):
+        getattr(role_client, method)(url, data)
+
+
+@pytest.mark.django_db
+def test_query_count_does_not_grow_with_data(
+        mixer, user, another_user, published_category, user_client):
+    def count(url):
+        # Первый запрос заполняет кэш границы публикации.
+        user_client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            user_client.get(url)
+        return len(context)
+
+    post = mixer.blend(
+        "blog.Post",
+        author=another_user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+        image="",
+    )
+    mixer.blend("blog.Comment", post=post, author=user)
+    small = count("/"), count(f"/posts/{post.id}/")
+    mixer.cycle(N_POSTS).blend(
+        "blog.Post",
+        author=mixer.SELECT,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=2),
+        image="",
+    )
+    mixer.cycle(N_COMMENTS).blend(
+        "blog.Comment", post=post, author=mixer.SELECT
+    )
+    assert (count("/"), count(f"/posts/{post.id}/")) == small
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", (
+    "/posts/{post}/edit/",
+    "/posts/{post}/delete/",
+    "/posts/{post}/delete_comment/{comment}/",
+))
+def test_write_query_count_does_not_grow_with_comments(
+        mixer, user, another_user, published_category, user_client,
+        form_data, url):
+    def count(n_comments):
+        post = mixer.blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            is_published=True,
+            pub_date=timezone.now() - timedelta(days=1),
+            image="",
+        )
+        mixer.cycle(n_comments).blend(
+            "blog.Comment", post=post, author=another_user
+        )
+        comment = mixer.blend("blog.Comment", post=post, author=user)
+        with CaptureQueriesContext(connection) as context:
+            user_client.post(
+                url.format(post=post.id, comment=comment.id),
+                form_data("blog:edit_post")
+            )
+        return len(context)
+
+    assert count(N_COMMENTS) == count(1)
@@ -0,0 +1,84 @@
+from io import BytesIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from PIL import Image
+
+from blog import renditions
+from jobs.models import Job
+
+
+def make_image(size):
+    img_io = BytesIO()
+    Image.new("RGB", size, color=(73, 109, 137)).save(img_io, format="JPEG")
+    return ImageFile(img_io, name="rendition_source.jpg")
+
+
+@pytest.fixture
+def post_with_large_image(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        is_published=True,
+        category=published_category,
+        author=user,
+        image=make_image((800, 600)),
+    )
+
+
+@pytest.mark.django_db
+def test_renditions_built_by_job(
+        post_with_large_image, user_client,
+        django_capture_on_commit_callbacks):
+    post = post_with_large_image
+    assert Job.objects.filter(key=f"renditions:{post.pk}").exists()
+    call_command("run_jobs", workers=0, once=True)
+    post.refresh_from_db()
+    assert post.image_renditions["width"] == 800
+    assert post.image_renditions["height"] == 600
+    assert [width for width, _ in post.image_renditions["webp"]] == [
+        320, 640, 800
+    ]
+    for name in renditions.rendition_names(post.image_renditions):
+        assert default_storage.exists(name)
+
+    response = user_client.get("/")
+    img = BeautifulSoup(response.content, "html.parser").select_one(
+        "picture img"
+    )
+    assert img["loading"] == "lazy"
+    assert (img["width"], img["height"]) == ("800", "600")
+    assert "320w" in img["srcset"]
+
+    old_names = renditions.rendition_names(post.image_renditions)
+    with django_capture_on_commit_callbacks() as callbacks:
+        post.delete()
+    assert all(default_storage.exists(name) for name in old_names), (
+        "Копии фото не должны удаляться до фиксации транзакции."
+    )
+    for callback in callbacks:
+        callback()
+    for name in old_names:
+        assert not default_storage.exists(name)
+
+
+@pytest.mark.django_db
+def test_backfill_command(post_with_large_image):
+    post = post_with_large_image
+    assert post.image_renditions == {}
+    call_command("build_renditions", workers=1)
+    post.refresh_from_db()
+    names = renditions.rendition_names(post.image_renditions)
+    try:
+        assert post.image_renditions["width"] == 800
+        assert post.image_renditions["source"] == post.image.name
+        assert [width for width, _ in post.image_renditions["jpeg"]] == [
+            320, 640, 800
+        ]
+        assert names
+        for name in names:
+            assert default_storage.exists(name)
+    finally:
+        renditions.delete_renditions(post.image_renditions)
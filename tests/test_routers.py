@@ -0,0 +1,84 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from django.test import Client, override_settings
+
+from blog.models import Post
+from blog.routers import (
+    PIN_COOKIE, ReplicaRouter, primary_reads, replica_reads
+)
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+def test_reads_go_to_replica_only_inside_block():
+    router = ReplicaRouter()
+    assert router.db_for_read(Post) == "default"
+    with replica_reads():
+        assert router.db_for_read(Post) == "replica_1"
+        assert router.db_for_write(Post) == "default"
+    assert router.db_for_read(Post) == "default"
+    assert not router.allow_migrate("replica_1", "blog")
+
+
+@pytest.mark.django_db
+@override_settings(DATABASE_REPLICAS=["default"])
+def test_writer_is_pinned_to_primary(
+        user_client, post_with_published_location):
+    response = user_client.post(
+        f"/posts/{post_with_published_location.id}/comment/",
+        {"text": "Комментарий"},
+    )
+    assert PIN_COOKIE in response.cookies
+    assert PIN_COOKIE not in user_client.get("/").cookies
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1", "replica_2"])
+def test_one_replica_per_block():
+    router = ReplicaRouter()
+    for _ in range(10):
+        with replica_reads():
+            chosen = {router.db_for_read(Post) for _ in range(20)}
+            assert len(chosen) == 1
+            with primary_reads():
+                assert router.db_for_read(Post) == "default"
+            assert router.db_for_read(Post) in chosen
+
+
+@pytest.fixture
+def file_replica(tmp_path, settings):
+    alias = "replica_1"
+    connections.databases[alias] = {
+        "ENGINE": "blogicum.db.sqlite3",
+        "NAME": str(tmp_path / "replica.sqlite3"),
+    }
+    settings.DATABASE_REPLICAS = [alias]
+    yield alias
+    connections[alias].close()
+    del connections.databases[alias]
+    delattr(connections._connections, alias)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_pinned_writer_reads_own_comment(
+        file_replica, client, user_client, mixer,
+        post_with_published_location):
+    post = post_with_published_location
+    reader = mixer.blend("auth.User")
+    client.force_login(reader)
+    url = f"/posts/{post.id}/"
+    call_command("sync_replicas", stdout=StringIO())
+    response = user_client.post(
+        f"/posts/{post.id}/comment/", {"text": "Свежий комментарий"}
+    )
+    assert PIN_COOKIE in response.cookies
+    assert "Свежий комментарий" in user_client.get(url).content.decode()
+    assert "Свежий комментарий" not in client.get(url).content.decode(), (
+        "Непривязанный читатель должен читать с реплики."
+    )
+    assert "Свежий комментарий" in Client().get(url).content.decode(), (
+        "Страница для кэша должна читаться с основной базы."
+    )
+    call_command("sync_replicas", stdout=StringIO())
+    assert "Свежий комментарий" in client.get(url).content.decode()
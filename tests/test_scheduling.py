@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from blog import scheduling
+from blog.query_utils import get_posts
+
+
+@pytest.mark.django_db
+def test_cutoff_advances_only_when_post_goes_live(
+        mixer, user, published_category, monkeypatch):
+    now = timezone.now()
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=now + timedelta(hours=1),
+    )
+    cutoff = scheduling.get_cutoff()
+    monkeypatch.setattr(
+        scheduling.timezone, "now", lambda: now + timedelta(minutes=30)
+    )
+    assert scheduling.get_cutoff() == cutoff
+    assert not get_posts(filter_flag=True).filter(pk=post.pk).exists()
+
+    monkeypatch.setattr(
+        scheduling.timezone, "now", lambda: now + timedelta(hours=2)
+    )
+    assert scheduling.get_cutoff() >= post.pub_date
+    assert get_posts(filter_flag=True).filter(pk=post.pk).exists()
+
+
+@pytest.mark.django_db
+def test_post_published_behind_cutoff_is_visible(
+        mixer, user, published_category, django_capture_on_commit_callbacks):
+    scheduling.get_cutoff()
+    with django_capture_on_commit_callbacks() as callbacks:
+        post = mixer.blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            is_published=True,
+            pub_date=timezone.now(),
+        )
+        assert cache.get(scheduling.STATE_KEY) is not None, (
+            "Граница не должна сбрасываться до фиксации транзакции."
+        )
+    for callback in callbacks:
+        callback()
+    assert cache.get(scheduling.STATE_KEY) is None
+    assert get_posts(filter_flag=True).filter(pk=post.pk).exists()
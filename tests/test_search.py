@@ -0,0 +1,100 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog import search
+from blog.models import Post
+from conftest import N_PER_PAGE
+
+
+def blend_post(mixer, user, category, **kwargs):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=category,
+        is_published=kwargs.pop("is_published", True),
+        pub_date=kwargs.pop("pub_date", timezone.now() - timedelta(days=1)),
+        text=kwargs.pop("text", "Текст"),
+        **kwargs,
+    )
+
+
+@pytest.mark.django_db
+def test_search_ranks_and_hides_unpublished(
+        mixer, user, published_category, client):
+    in_text = blend_post(
+        mixer, user, published_category,
+        title="Прогулка", text="Видели ёжика у реки",
+    )
+    in_title = blend_post(
+        mixer, user, published_category,
+        title="Ёжик в тумане", text="Мультфильм",
+    )
+    blend_post(
+        mixer, user, published_category,
+        title="Ёжик", text="Черновик", is_published=False,
+    )
+    blend_post(
+        mixer, user, published_category,
+        title="Ёжик", text="Будущий", pub_date=timezone.now() + timedelta(1),
+    )
+    response = client.get("/search/", {"q": "ёжик"})
+    assert response.status_code == HTTPStatus.OK
+    assert [post.id for post in response.context["page_obj"]] == [
+        in_title.id, in_text.id
+    ]
+
+
+@pytest.mark.django_db
+def test_search_cursor_walk(mixer, user, published_category, client):
+    posts = mixer.cycle(N_PER_PAGE + 3).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+        title="Одинаковый заголовок",
+        text="Одинаковый текст",
+    )
+    seen = []
+    response = client.get("/search/", {"q": "заголовок"})
+    seen.extend(post.id for post in response.context["page_obj"])
+    cursor = response.context["page_obj"].next_cursor
+    response = client.get("/search/", {"q": "заголовок", "cursor": cursor})
+    seen.extend(post.id for post in response.context["page_obj"])
+    assert sorted(seen) == sorted(post.id for post in posts)
+    assert response.context["page_obj"].next_cursor is None
+    assert client.get(
+        "/search/", {"q": "заголовок", "cursor": "!"}
+    ).status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_index_follows_edits_and_rebuild(mixer, user, published_category):
+    post = blend_post(mixer, user, published_category, title="Старое")
+    found = search.matching(Post.objects.all(), "старое")
+    assert list(found) == [post]
+    post.title = "Новое"
+    post.save()
+    assert not search.matching(Post.objects.all(), "старое").exists()
+    post.delete()
+    assert not search.matching(Post.objects.all(), "новое").exists()
+
+    post = blend_post(mixer, user, published_category, title='"Кавычки" OR')
+    Post.objects.filter(pk=post.pk).update(title="Обновлено")
+    call_command("rebuild_search_index")
+    assert list(search.matching(Post.objects.all(), "обновлено")) == [post]
+    assert not search.matching(Post.objects.all(), '" OR').exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", ["/search/", "/search/?q=", "/search/?q=!!"])
+def test_empty_query_returns_empty_page(
+        mixer, user, published_category, client, url):
+    blend_post(mixer, user, published_category, title="Прогулка")
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert not response.context["post_obj"]
@@ -0,0 +1,48 @@
+import sqlite3
+
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blogicum.db.sqlite3.base import DatabaseWrapper
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def file_connection(tmp_path):
+    wrapper = DatabaseWrapper(
+        {**connection.settings_dict, "NAME": str(tmp_path / "db.sqlite3")},
+        alias="sqlite_test",
+    )
+    yield wrapper
+    wrapper.close()
+
+
+def pragma(wrapper, name):
+    with wrapper.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+def test_pragmas_applied_on_connect(file_connection):
+    assert pragma(file_connection, "journal_mode") == "wal"
+    assert pragma(file_connection, "busy_timeout") == (
+        settings.SQLITE_PRAGMAS["busy_timeout"]
+    )
+    assert pragma(file_connection, "synchronous") == 1
+    assert pragma(file_connection, "temp_store") == 2
+
+
+def test_transactions_begin_immediate(file_connection, tmp_path):
+    with CaptureQueriesContext(file_connection) as queries:
+        file_connection._start_transaction_under_autocommit()
+    assert queries.captured_queries[-1]["sql"] == "BEGIN IMMEDIATE"
+    other = sqlite3.connect(tmp_path / "db.sqlite3", timeout=0)
+    try:
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            other.execute("BEGIN IMMEDIATE")
+    finally:
+        other.close()
+        file_connection.connection.rollback()
@@ -0,0 +1,67 @@
+import gzip
+from http import HTTPStatus
+
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import RequestFactory, override_settings
+
+from blogicum import static
+from blogicum.storage import brotli
+
+
+@pytest.fixture(scope="module")
+def collected(tmp_path_factory):
+    root = tmp_path_factory.mktemp("static")
+    with override_settings(
+        STATIC_ROOT=root,
+        STATICFILES_STORAGE=(
+            "blogicum.storage.CompressedManifestStaticFilesStorage"
+        ),
+    ):
+        call_command("collectstatic", interactive=False, verbosity=0)
+        yield root, staticfiles_storage.stored_name("css/bootstrap.min.css")
+
+
+def test_precompressed_variants_are_served(collected):
+    root, name = collected
+    assert (root / f"{name}.gz").exists()
+    request = RequestFactory().get(
+        f"/static/{name}", HTTP_ACCEPT_ENCODING="gzip, deflate"
+    )
+    with override_settings(STATIC_ROOT=root):
+        response = static.serve(request, name)
+    assert response.status_code == HTTPStatus.OK
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Content-Type"].startswith("text/css")
+    assert response["Vary"] == "Accept-Encoding"
+    assert response["Cache-Control"] == (
+        "public, max-age=31536000, immutable"
+    )
+    assert gzip.decompress(b"".join(response.streaming_content)) == (
+        (root / name).read_bytes()
+    )
+
+
+def test_brotli_preferred_and_identity_fallback(collected):
+    root, name = collected
+    factory = RequestFactory()
+    with override_settings(STATIC_ROOT=root):
+        plain = static.serve(factory.get(f"/static/{name}"), name)
+        if brotli is not None:
+            compressed = static.serve(
+                factory.get(
+                    f"/static/{name}", HTTP_ACCEPT_ENCODING="gzip, br"
+                ),
+                name,
+            )
+            assert compressed["Content-Encoding"] == "br"
+    assert "Content-Encoding" not in plain
+    assert b"".join(plain.streaming_content) == (root / name).read_bytes()
+
+
+@pytest.mark.django_db
+def test_bootstrap_is_served_locally(client):
+    content = client.get("/").content.decode()
+    assert "cdn.jsdelivr.net" not in content
+    assert "/static/css/bootstrap.min.css" in content
@@ -0,0 +1,107 @@
+import json
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template import Context, Template
+from django.template.loader import get_template
+from django.test import Client
+
+from blog import template_profiler
+from blog.tasks import make_request
+from blog.management.commands.bench_templates import (
+    TEMPLATES, build_context, fragment_keys
+)
+
+
+@pytest.fixture(autouse=True)
+def restore_template_engine():
+    yield
+    template_profiler.uninstall()
+
+
+def test_profile_breaks_down_nodes():
+    template = Template("{% for i in items %}{{ i }}{% endfor %}")
+    with template_profiler.profile() as profile:
+        template.render(Context({"items": range(3)}))
+    report = profile.report()
+    nodes = {row["node"]: row for row in report["nodes"]}
+    assert nodes["ForNode"]["calls"] == 1
+    assert nodes["VariableNode"]["calls"] == 3
+    assert nodes["ForNode"]["total_ms"] >= nodes["ForNode"]["self_ms"]
+    assert report["render_ms"] >= nodes["ForNode"]["total_ms"]
+
+
+def test_bench_templates_renders_without_database(tmp_path):
+    output = tmp_path / "templates.json"
+    call_command(
+        "bench_templates",
+        iterations=2,
+        warmup=1,
+        profile_iterations=1,
+        output=str(output),
+        stderr=StringIO(),
+    )
+    results = json.loads(output.read_text())["templates"]
+    assert set(results) == set(TEMPLATES)
+    index = results["blog/index.html"]
+    assert index["bytes"] > 0
+    assert index["warm"]["mean_ms"] > 0
+    included = {row["template"]: row for row in index["profile"]["templates"]}
+    assert included["includes/post_card.html"]["calls"] == 10
+
+
+@pytest.mark.django_db
+def test_profiler_middleware(settings, user, post_with_published_location):
+    settings.TEMPLATE_PROFILER = True
+    client = Client()
+    client.force_login(user)
+    response = client.get("/?profile_templates")
+    assert response["Content-Type"].startswith("text/html")
+    user.is_staff = True
+    user.save()
+    response = client.get("/?profile_templates")
+    assert response.status_code == HTTPStatus.OK
+    report = response.json()
+    assert report["status"] == HTTPStatus.OK
+    templates = {row["template"] for row in report["templates"]}
+    assert {"blog/index.html", "includes/post_card.html"} <= templates
+    assert report["nodes"]
+
+
+def test_cold_bench_keeps_other_cache_keys():
+    cache.set("blog:unrelated", 1)
+    call_command(
+        "bench_templates",
+        template=["blog/index.html"],
+        iterations=2,
+        warmup=1,
+        profile_iterations=1,
+        stdout=StringIO(),
+        stderr=StringIO(),
+    )
+    assert cache.get("blog:unrelated") == 1
+
+
+def test_fragment_keys_match_cache_tag():
+    context = build_context()
+    get_template("blog/index.html").render(context, make_request("/"))
+    keys = fragment_keys(context)
+    assert len(cache.get_many(keys)) == len(keys), (
+        "Карточки постов должны кэшироваться под ключами fragment_keys."
+    )
+
+
+@pytest.mark.django_db
+def test_profiler_middleware_restores_engine(
+        settings, admin_client, post_with_published_location):
+    from django.template.base import Node
+
+    settings.TEMPLATE_PROFILER = True
+    original = Node.render_annotated
+    assert admin_client.get("/?profile_templates").status_code == (
+        HTTPStatus.OK
+    )
+    assert Node.render_annotated is original
@@ -0,0 +1,80 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+
+from blog.forms import PostForm
+from blog.uploads import LimitedTemporaryFileUploadHandler
+
+
+def jpeg_upload(size, orientation=None):
+    image = Image.new("RGB", size, color=(200, 30, 30))
+    exif = Image.Exif()
+    exif[0x010F] = "Phone"
+    if orientation:
+        exif[0x0112] = orientation
+    data = BytesIO()
+    image.save(data, "JPEG", exif=exif)
+    return SimpleUploadedFile(
+        "photo.jpg", data.getvalue(), content_type="image/jpeg"
+    )
+
+
+def bound_form(upload, published_category):
+    return PostForm(
+        data={
+            "title": "Фото",
+            "text": "Текст",
+            "pub_date": "2020-01-01 10:00",
+            "category": published_category.pk,
+        },
+        files={"image": upload},
+    )
+
+
+@pytest.mark.django_db
+@override_settings(IMAGE_MAX_DIMENSION=400)
+def test_image_is_rotated_downscaled_and_stripped(published_category):
+    upload = jpeg_upload((800, 600), orientation=6)
+    form = bound_form(upload, published_category)
+    assert form.is_valid(), form.errors
+    upload = form.cleaned_data["image"]
+    with Image.open(upload) as stored:
+        assert stored.size == (300, 400)
+        assert not stored.getexif()
+
+
+@pytest.mark.django_db
+def test_small_clean_image_is_kept(published_category):
+    image = Image.new("RGB", (100, 100))
+    data = BytesIO()
+    image.save(data, "PNG")
+    upload = SimpleUploadedFile("small.png", data.getvalue())
+    form = bound_form(upload, published_category)
+    assert form.is_valid(), form.errors
+    assert form.cleaned_data["image"] is upload
+
+
+@pytest.mark.django_db
+@override_settings(IMAGE_MAX_PIXELS=1000)
+def test_too_many_pixels_rejected(published_category):
+    form = bound_form(jpeg_upload((100, 100)), published_category)
+    assert not form.is_valid()
+    assert form.errors["image"][0].startswith("Изображение больше")
+
+
+@pytest.mark.django_db
+@override_settings(IMAGE_UPLOAD_MAX_BYTES=1024)
+def test_handler_drops_data_past_limit(published_category):
+    handler = LimitedTemporaryFileUploadHandler()
+    handler.new_file("image", "big.jpg", "image/jpeg", 4096)
+    for start in range(0, 4096, 512):
+        handler.receive_data_chunk(b"x" * 512, start)
+    upload = handler.file_complete(4096)
+    assert upload.size == 4096
+    assert len(upload.read()) == 1024
+    form = bound_form(upload, published_category)
+    assert not form.is_valid()
+    assert form.errors["image"][0].startswith("Файл больше")
@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from blog import write_queue
+from blog.models import Category, Comment, Post
+from blog.write_queue import WriteQueue, run_write, save_files
+
+
+@pytest.fixture
+def batches(settings, monkeypatch):
+    settings.WRITE_QUEUE = True
+    queue = WriteQueue(batch_size=10, batch_wait=0.5)
+    sizes = []
+    commit = queue._commit
+
+    def recording_commit(batch):
+        sizes.append(len(batch))
+        return commit(batch)
+
+    monkeypatch.setattr(queue, "_commit", recording_commit)
+    monkeypatch.setattr(write_queue, "_write_queue", queue)
+    return sizes
+
+
+def create_category(slug):
+    return Category.objects.create(
+        title=slug, description="Описание", slug=slug
+    ).pk
+
+
+def create_category_and_fail(slug):
+    create_category(slug)
+    raise ValueError(slug)
+
+
+def run_concurrently(*calls):
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        futures = [executor.submit(run_write, *call) for call in calls]
+    return futures
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_writes_share_transaction(batches):
+    slugs = [f"queued-{index}" for index in range(5)]
+    futures = run_concurrently(*((create_category, slug) for slug in slugs))
+    assert all(future.result() for future in futures)
+    assert batches == [len(slugs)]
+    assert Category.objects.filter(slug__in=slugs).count() == len(slugs)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_failed_write_rolls_back_alone(batches):
+    futures = run_concurrently(
+        (create_category, "kept-first"),
+        (create_category_and_fail, "rolled-back"),
+        (create_category, "kept-second"),
+    )
+    with pytest.raises(ValueError, match="rolled-back"):
+        futures[1].result()
+    assert futures[0].result() and futures[2].result()
+    assert batches == [3]
+    assert set(Category.objects.values_list("slug", flat=True)) == {
+        "kept-first", "kept-second"
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_queued_save_sets_pk(batches, user, post_with_published_location):
+    comment = Comment(
+        post=post_with_published_location, author=user, text="Через очередь"
+    )
+    run_write(comment.save)
+    assert batches == [1]
+    assert comment.pk is not None
+    assert Comment.objects.filter(pk=comment.pk).exists()
+
+
+def test_save_files_before_queue():
+    post = Post(image=SimpleUploadedFile("queued.gif", b"GIF89a"))
+    save_files(post)
+    try:
+        assert post.image._committed
+        assert default_storage.exists(post.image.name)
+        assert post.image.name.startswith("post_image/")
+    finally:
+        default_storage.delete(post.image.name)